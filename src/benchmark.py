@@ -0,0 +1,289 @@
+"""
+Headless benchmark suite for the rendering hot paths.
+
+Usage (from the src directory):
+    python -m benchmark --output results.json
+    python -m benchmark --baseline results.json --threshold 0.2
+
+Every result is a duration in milliseconds (lower is better). In comparison mode the exit code is 1 if any
+result is slower than the baseline by more than the threshold.
+"""
+import os
+
+# Must be set before pygame is imported, to run without a display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import pygame
+from config.config import Config
+from entities.depth_map import DepthMap
+from entities.layer import Layer
+from entities.menu import Menu
+from entities.noise_field import NoiseField
+from entities.noise_ring import NoiseRing
+from entities.stereogram_engine import StereogramEngine
+from enums.game_type import GameType
+from enums.layer_type import LayerType
+from enums.renderer_type import RendererType
+from enums.summary_menu_item import SummaryMenuItem
+from games.fusional_vergence_game import FusionalVergenceGame
+from renderers.anaglyph_compositor import AnaglyphCompositor
+from utils import set_display_mode
+
+SCREEN_SIZE = (1920, 1080)
+LAYER_SIZES = ((300, 225), (600, 450), (1200, 900), (2400, 1800))
+DISPARITY = 12
+DEFAULT_THRESHOLD = 0.2
+
+_COLD_START_SCRIPT = """
+import time
+start = time.perf_counter()
+from config.config import Config
+from entities.open_vision import OpenVision
+OpenVision(Config())
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def _median_ms(function, repeats):
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def bench_layer_surface(cfg, repeats):
+    results = {}
+    for width, height in LAYER_SIZES:
+        square_size = min(cfg.square_size, width // 2, height // 2)
+        noise_matrix = NoiseField(width, height, cfg.noise_intensity, seed=0).generate()
+        for layer_type in LayerType:
+            layer = Layer(cfg, layer_type, width, height, square_size, DISPARITY)
+            results[f"layer_create_surface[{layer_type.value.lower()},{width}x{height}]"] = _median_ms(
+                lambda: layer.create_surface(noise_matrix, width // 4, height // 4), repeats
+            )
+    return results
+
+
+def bench_stereogram_engine(cfg, repeats):
+    """
+    Stereogram engine rendering of depth maps with one target and with many targets of several depths and shapes,
+    covering about the same area.
+    """
+    width, height = cfg.layer_width, cfg.layer_height
+    noise_matrix = NoiseField(width, height, cfg.noise_intensity, seed=0).generate()
+    engine = StereogramEngine(width, height)
+
+    single_target = DepthMap(width, height, cfg.z_screen_mm).add_rect(width // 4, height // 4, width // 4, height // 4, cfg.z_object_mm)
+    many_targets = DepthMap(width, height, cfg.z_screen_mm)
+    for i in range(64):
+        x, y = (i % 8) * width // 8, (i // 8) * height // 8
+        if i % 2:
+            many_targets.add_rect(x, y, width // 32, height // 32, cfg.z_object_mm - i % 4)
+        else:
+            many_targets.add_ellipse(x, y, width // 32, height // 32, cfg.z_object_mm - i % 4)
+
+    results = {}
+    for name, depth_map in (("1_target", single_target), ("64_targets", many_targets)):
+        disparity_map = depth_map.to_disparity_map(cfg, *SCREEN_SIZE)
+        results[f"stereogram_engine[{name},{width}x{height}]"] = _median_ms(
+            lambda: engine.render_surfaces(noise_matrix, disparity_map), repeats
+        )
+    return results
+
+
+def bench_dynamic_frames(cfg, screen, frames):
+    """
+    Average synthesis time of a dynamic noise frame (both layers composited into the anaglyph), to be compared
+    with the frame budget at the target frame rate.
+    """
+    results = {}
+    for width, height in LAYER_SIZES:
+        square_size = min(cfg.square_size, width // 2, height // 2)
+        noise_ring = NoiseRing(NoiseField(width, height, cfg.noise_intensity, seed=0), cfg.dynamic_noise_frames)
+        red_layer = Layer(cfg, LayerType.RED, width, height, square_size, DISPARITY)
+        blue_layer = Layer(cfg, LayerType.BLUE, width, height, square_size, DISPARITY)
+        compositor = AnaglyphCompositor(screen, 1)
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            noise_frame = noise_ring.next()
+            compositor.compose(
+                red_layer.create_pixels(noise_frame, width // 4, height // 4),
+                blue_layer.create_pixels(noise_frame, width // 4, height // 4),
+                40
+            )
+        results[f"dynamic_frame_generation[{width}x{height}]"] = (time.perf_counter() - start) * 1000 / frames
+    return results
+
+
+def _click_event():
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pygame.mouse.get_pos(), button=1, timestamp=time.perf_counter())
+
+
+def _game_frame_ms(cfg, screen, frames):
+    game = FusionalVergenceGame(cfg, screen, GameType.JUMP_DUCTION)
+    game.start_ticks = pygame.time.get_ticks()
+    game.renderer.invalidate()
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        game._update_timer()
+        if frame % 30 == 0:
+            game._on_mouse_click(_click_event())
+        game._draw_scene()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def bench_game_frames(cfg, screen, frames):
+    """
+    Average duration of a full game frame (timer, clicks every 30 frames, scene drawing), per renderer
+    and with dynamic noise.
+    """
+    results = {}
+    for renderer_type in RendererType:
+        cfg.renderer = renderer_type.value
+        # The texture renderer needs a window with an SDL renderer
+        screen = set_display_mode(cfg, SCREEN_SIZE)
+        results[f"game_frame[{renderer_type.value}]"] = _game_frame_ms(cfg, screen, frames)
+
+    cfg.renderer = RendererType.DIRTY_RECT.value
+    screen = set_display_mode(cfg, SCREEN_SIZE)
+    cfg.dynamic_noise = True
+    results["game_frame[dynamic_noise]"] = _game_frame_ms(cfg, screen, frames)
+    cfg.dynamic_noise = False
+    return results
+
+
+def bench_menu_frames(cfg, screen, frames):
+    menu = Menu(
+        cfg,
+        screen,
+        items_enum=SummaryMenuItem,
+        title="Benchmark",
+        subtitle="Base IN Score: 40\nB-R cycles: IN 15-5, 15-10, 20-15\nSeed: 0"
+    )
+    items = list(menu.items_dict.keys())
+    start = time.perf_counter()
+    for frame in range(frames):
+        menu._draw(items[frame % len(items)])
+    full_draw_ms = (time.perf_counter() - start) * 1000 / frames
+
+    selected_item = items[0]
+    start = time.perf_counter()
+    for frame in range(frames):
+        selected_item = menu._change_selection(selected_item, items[(frame + 1) % len(items)])
+    selection_change_ms = (time.perf_counter() - start) * 1000 / frames
+
+    return {"menu_frame": full_draw_ms, "menu_selection_change": selection_change_ms}
+
+
+def bench_cold_start(repeats):
+    """
+    Construction time of OpenVision in a fresh interpreter (pygame init, display, fonts, main menu).
+    """
+    durations = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", _COLD_START_SCRIPT],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        durations.append(float(output.strip().splitlines()[-1]))
+    return {"open_vision_cold_start": statistics.median(durations)}
+
+
+def run_benchmarks(quick=False):
+    repeats = 3 if quick else 10
+    frames = 100 if quick else 600
+
+    cfg = Config()
+    cfg.prefetch_trials = 0
+    cfg.noise_seed = 0
+
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+
+    results = {}
+    results.update(bench_layer_surface(cfg, repeats))
+    results.update(bench_stereogram_engine(cfg, repeats))
+    results.update(bench_dynamic_frames(cfg, screen, frames))
+    results.update(bench_game_frames(cfg, screen, frames))
+    results.update(bench_menu_frames(cfg, pygame.display.get_surface(), frames))
+    pygame.quit()
+    results.update(bench_cold_start(repeats))
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "video_driver": os.environ["SDL_VIDEODRIVER"]
+        },
+        "unit": "ms",
+        "results": results
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare the results with a baseline.
+
+    :return: the names of the results slower than the baseline by more than the threshold
+    :rtype: list[str]
+    """
+    regressions = []
+    for name, value in results["results"].items():
+        baseline_value = baseline["results"].get(name)
+        if baseline_value is None:
+            print(f"{name:<45} {value:>10.3f} ms  (not in baseline)")
+            continue
+        change = (value - baseline_value) / baseline_value if baseline_value else 0
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<45} {value:>10.3f} ms  {change:+8.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks of stimulus generation, game frames and menus.")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results with this JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"maximum allowed slowdown w.r.t. the baseline (default {DEFAULT_THRESHOLD})")
+    parser.add_argument("--quick", action="store_true", help="fewer repeats and frames")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.quick)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    else:
+        for name, value in results["results"].items():
+            print(f"{name:<45} {value:>10.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Prebuild the stimulus bank: generate the noise of the configured layers for a set of seeds and store it, so that
+the sessions map it instead of generating it at startup.
+
+Usage (from the src directory):
+    python -m build_stimulus_bank --count 64
+    python -m build_stimulus_bank --seed-start 0 --seed-end 100 --frames 32
+    python -m build_stimulus_bank --reindex
+
+Without explicit seeds, random seeds are drawn (stimulus_bank_min_seeds by default): the sessions without a fixed
+seed (noise_seed: null) rotate through them, provided the bank holds at least stimulus_bank_min_seeds of them.
+The dynamic noise frames are built as configured (dynamic_noise and dynamic_noise_frames) unless --frames is given.
+"""
+import argparse
+import secrets
+import sys
+import time
+from config.config import Config, DEFAULT_CONFIG_FILE_PATH
+from entities.noise_field import NoiseField
+from entities.stimulus_bank import StimulusBank
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate the noise of the configured layers into the stimulus bank.")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_FILE_PATH, help="configuration file")
+    parser.add_argument("--count", type=int, help="number of random seeds (default: stimulus_bank_min_seeds)")
+    parser.add_argument("--seed-start", type=int, help="first seed (included), instead of random seeds")
+    parser.add_argument("--seed-end", type=int, help="last seed (excluded)")
+    parser.add_argument("--frames", type=int, help="dynamic noise frames per seed, 0 for none (default: as configured)")
+    parser.add_argument("--dir", help="bank directory (default: stimulus_bank_dir)")
+    parser.add_argument("--max-mb", type=int, help="maximum size of the bank in MB (default: stimulus_bank_max_mb)")
+    parser.add_argument("--reindex", action="store_true", help="only rebuild the index of the bank from its files")
+    args = parser.parse_args()
+
+    cfg = Config(args.config)
+    bank = StimulusBank(args.dir or cfg.stimulus_bank_dir, args.max_mb or cfg.stimulus_bank_max_mb, cfg.stimulus_bank_min_seeds)
+    if bank.path is None:
+        parser.error("the stimulus bank is disabled: set stimulus_bank_dir or --dir")
+    if args.reindex:
+        print(f"{bank.reindex()} seeds indexed, bank size {bank.get_size() / 2 ** 20:.1f} MB", file=sys.stderr)
+        return 0
+    if (args.seed_start is None) != (args.seed_end is None):
+        parser.error("--seed-start and --seed-end must be given together")
+    if args.seed_start is not None:
+        if args.seed_end <= args.seed_start:
+            parser.error("--seed-end must be greater than --seed-start")
+        seeds = range(args.seed_start, args.seed_end)
+    else:
+        seeds = [secrets.randbits(32) for _ in range(args.count if args.count is not None else cfg.stimulus_bank_min_seeds)]
+    frame_count = args.frames if args.frames is not None else (cfg.dynamic_noise_frames if cfg.dynamic_noise else 0)
+
+    # The noise is generated on the grid of dots, as in the game
+    width, height = cfg.layer_width // cfg.dot_size, cfg.layer_height // cfg.dot_size
+    start = time.perf_counter()
+    stored_bytes = 0
+    for index, seed in enumerate(seeds):
+        stored_bytes += bank.build(NoiseField(width, height, cfg.noise_intensity, seed), frame_count)
+        print(f"\r{index + 1}/{len(seeds)} seeds", end="", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    banked = bank.get_seeds(width, height, cfg.noise_intensity, frame_count)
+    print(
+        f"\r{len(seeds)} seeds ({width}x{height}, {frame_count} frames) in {elapsed:.2f}s, {stored_bytes / 2 ** 20:.1f} MB stored, "
+        f"{len(banked)} seeds banked for this configuration, bank size {bank.get_size() / 2 ** 20:.1f}/{bank.max_size_mb} MB",
+        file=sys.stderr
+    )
+    evicted = set(seeds) - set(banked)
+    if evicted:
+        print(f"Warning: the bank is too small, {len(evicted)} of the seeds were evicted", file=sys.stderr)
+    if len(banked) < bank.min_seeds:
+        print(f"Warning: {len(banked)} seeds banked, the sessions without a fixed seed need at least {bank.min_seeds}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,8 +12,13 @@ DEFAULT_Z_OBJECT_MM = 490
 
 DEFAULT_LAYER_WIDTH = 600
 DEFAULT_LAYER_HEIGHT = 450
+DEFAULT_DOT_SIZE = 1
 
 DEFAULT_NOISE_INTENSITY = 180
+DEFAULT_NOISE_SEED = None
+DEFAULT_REFRESH_NOISE_PER_TRIAL = False
+DEFAULT_DYNAMIC_NOISE = False
+DEFAULT_DYNAMIC_NOISE_FRAMES = 32
 DEFAULT_SQUARE_SIZE = 80
 
 DEFAULT_MIN_OFFSET = 0
@@ -21,8 +26,37 @@ DEFAULT_MAX_OFFSET = 800
 DEFAULT_INITIAL_OFFSET = 0
 DEFAULT_STEP = 5
 
+DEFAULT_STAIRCASE = "fixed"
+DEFAULT_QUEST_GRID_STEP = 1
+DEFAULT_QUEST_SLOPE = 10
+DEFAULT_QUEST_LAPSE_RATE = 0.02
+DEFAULT_QUEST_PRIOR_SD = 100
+
 DEFAULT_GAME_DURATION_SEC = 180
 
+DEFAULT_PREFETCH_TRIALS = 2
+
+DEFAULT_STIMULUS_BANK_DIR = "stimulus_bank"
+DEFAULT_STIMULUS_BANK_MAX_MB = 2048
+DEFAULT_STIMULUS_BANK_MIN_SEEDS = 32
+
+DEFAULT_RENDERER = "dirty_rect"
+DEFAULT_TARGET_FPS = 60
+DEFAULT_VSYNC = True
+DEFAULT_IDLE_RENDERING = True
+
+DEFAULT_WARM_UP_FONTS = True
+
+DEFAULT_PATIENT_ID = None
+DEFAULT_RESULTS_DB = "results.db"
+DEFAULT_RESULTS_FALLBACK = "results_pending.jsonl"
+
+DEFAULT_RECORD_SESSIONS = False
+DEFAULT_RECORDINGS_DIR = "recordings"
+
+DEFAULT_INSTRUMENTATION = False
+DEFAULT_INSTRUMENTATION_DIR = "instrumentation"
+
 class Config:
     def __init__(self, config_file=DEFAULT_CONFIG_FILE_PATH):
         # Load the configuration from a YAML file
@@ -40,9 +74,19 @@ class Config:
         # Layer settings
         self.layer_width = config_data.get("layer_width", DEFAULT_LAYER_WIDTH)
         self.layer_height = config_data.get("layer_height", DEFAULT_LAYER_HEIGHT)
+        # Size of a noise dot in screen pixels: the stimuli are generated on the grid of dots and upscaled
+        # (layer size, square size and disparity are still given in pixels)
+        self.dot_size = config_data.get("dot_size", DEFAULT_DOT_SIZE)
         
         # Noise settings
         self.noise_intensity = config_data.get("noise_intensity", DEFAULT_NOISE_INTENSITY)
+        # Seed of the stimuli (random if not set), shown in the game summary to reproduce the session
+        self.noise_seed = config_data.get("noise_seed", DEFAULT_NOISE_SEED)
+        # Generate fresh noise at every trial, to prevent pattern memorization
+        self.refresh_noise_per_trial = config_data.get("refresh_noise_per_trial", DEFAULT_REFRESH_NOISE_PER_TRIAL)
+        # Dynamic random-dot stereograms: the noise changes at every frame, cycling through pre-generated frames
+        self.dynamic_noise = config_data.get("dynamic_noise", DEFAULT_DYNAMIC_NOISE)
+        self.dynamic_noise_frames = config_data.get("dynamic_noise_frames", DEFAULT_DYNAMIC_NOISE_FRAMES)
         
         # Hidden square size
         self.square_size = config_data.get("square_size", DEFAULT_SQUARE_SIZE)
@@ -53,5 +97,52 @@ class Config:
         self.initial_offset = config_data.get("initial_offset", DEFAULT_INITIAL_OFFSET)
         self.step = config_data.get("step", DEFAULT_STEP)
 
+        # Staircase of the offset: "fixed" moves by step at every answer, "quest" chooses the most informative offset
+        # (multiple of step) from a Bayesian estimate of the break threshold, with a prior centered on initial_offset
+        self.staircase = config_data.get("staircase", DEFAULT_STAIRCASE)
+        self.quest_grid_step = config_data.get("quest_grid_step", DEFAULT_QUEST_GRID_STEP)
+        self.quest_slope = config_data.get("quest_slope", DEFAULT_QUEST_SLOPE)
+        self.quest_lapse_rate = config_data.get("quest_lapse_rate", DEFAULT_QUEST_LAPSE_RATE)
+        self.quest_prior_sd = config_data.get("quest_prior_sd", DEFAULT_QUEST_PRIOR_SD)
+
         # Game duration
-        self.game_duration_sec = config_data.get("game_duration_sec", DEFAULT_GAME_DURATION_SEC)
\ No newline at end of file
+        self.game_duration_sec = config_data.get("game_duration_sec", DEFAULT_GAME_DURATION_SEC)
+
+        # Number of trials pre-generated in background when the noise is refreshed per trial (0 to generate them on click).
+        # With the same noise for every trial, only the square regions of the layers are updated on click
+        self.prefetch_trials = config_data.get("prefetch_trials", DEFAULT_PREFETCH_TRIALS)
+
+        # Pre-generated noise mapped at the start of a session, built with the build_stimulus_bank tool
+        # (null to disable), and its maximum size: the least recently used noise is evicted above it
+        self.stimulus_bank_dir = config_data.get("stimulus_bank_dir", DEFAULT_STIMULUS_BANK_DIR)
+        self.stimulus_bank_max_mb = config_data.get("stimulus_bank_max_mb", DEFAULT_STIMULUS_BANK_MAX_MB)
+        # Sessions without a fixed seed use the bank only with at least this many seeds, rotating through them
+        # least recently used first, so that the patients do not see the same noise again too soon
+        self.stimulus_bank_min_seeds = config_data.get("stimulus_bank_min_seeds", DEFAULT_STIMULUS_BANK_MIN_SEEDS)
+
+        # Rendering settings ("dirty_rect" updates only the changed regions, "full_frame" redraws the whole screen,
+        # "texture" draws textures with the SDL renderer, blending the layers on the GPU if available)
+        self.renderer = config_data.get("renderer", DEFAULT_RENDERER)
+        # Present the frames aligned to the display refresh, if available (texture renderer only)
+        self.vsync = config_data.get("vsync", DEFAULT_VSYNC)
+        # Maximum frame rate, set it to the display refresh rate (e.g. 120 or 144) for a smoother cursor
+        self.target_fps = config_data.get("target_fps", DEFAULT_TARGET_FPS)
+        # Render only when the scene changes, sleeping while idle
+        self.idle_rendering = config_data.get("idle_rendering", DEFAULT_IDLE_RENDERING)
+
+        # Load all the fonts at startup, instead of at the first menu or game
+        self.warm_up_fonts = config_data.get("warm_up_fonts", DEFAULT_WARM_UP_FONTS)
+
+        # Patient the sessions are stored for, and SQLite database of the session results (not stored if not set)
+        self.patient_id = config_data.get("patient_id", DEFAULT_PATIENT_ID)
+        self.results_db = config_data.get("results_db", DEFAULT_RESULTS_DB)
+        # File the results are appended to while the database cannot be written, imported at the next write
+        self.results_fallback = config_data.get("results_fallback", DEFAULT_RESULTS_FALLBACK)
+
+        # Record every session (seed, configuration, clicks and prism transitions) to be replayed with the replay tool
+        self.record_sessions = config_data.get("record_sessions", DEFAULT_RECORD_SESSIONS)
+        self.recordings_dir = config_data.get("recordings_dir", DEFAULT_RECORDINGS_DIR)
+
+        # Performance instrumentation, exported per session (F12 toggles a cProfile capture while playing)
+        self.instrumentation = config_data.get("instrumentation", DEFAULT_INSTRUMENTATION)
+        self.instrumentation_dir = config_data.get("instrumentation_dir", DEFAULT_INSTRUMENTATION_DIR)
\ No newline at end of file
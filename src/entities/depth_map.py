@@ -0,0 +1,49 @@
+import numpy as np
+from utils import calc_disparities
+
+
+class DepthMap:
+    """
+    Per-pixel distance of a scene from the observer, in millimeters: targets of any shape and depth
+    drawn over the screen plane. A target drawn later covers the previous ones.
+    """
+
+    def __init__(self, width: int, height: int, z_screen_mm: float):
+        self.width = width
+        self.height = height
+        self.z_mm = np.full((height, width), z_screen_mm, dtype=np.float64)
+
+    def add_rect(self, x: int, y: int, width: int, height: int, z_mm: float):
+        """Adds a rectangular target with top left corner (x, y)"""
+        self.z_mm[max(0, y):max(0, y + height), max(0, x):max(0, x + width)] = z_mm
+        return self
+
+    def add_ellipse(self, x: int, y: int, width: int, height: int, z_mm: float):
+        """Adds an elliptic target inscribed in the given rectangle"""
+        rows, cols = np.ogrid[:self.height, :self.width]
+        center_x, center_y = x + width / 2, y + height / 2
+        mask = ((cols + 0.5 - center_x) / (width / 2)) ** 2 + ((rows + 0.5 - center_y) / (height / 2)) ** 2 <= 1
+        self.z_mm[mask] = z_mm
+        return self
+
+    def add_mask(self, mask, x: int, y: int, z_mm: float):
+        """
+        Adds a target of arbitrary shape, given by a (height, width) boolean mask placed with its top left corner
+        at (x, y), clipped to the map.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        x_start, y_start = max(0, x), max(0, y)
+        x_end, y_end = min(self.width, x + mask.shape[1]), min(self.height, y + mask.shape[0])
+        if x_start < x_end and y_start < y_end:
+            region = self.z_mm[y_start:y_end, x_start:x_end]
+            region[mask[y_start - y:y_end - y, x_start - x:x_end - x]] = z_mm
+        return self
+
+    def to_disparity_map(self, cfg, screen_width: int, screen_height: int):
+        """
+        Converts the map to pixel disparities for the given screen, signed as calc_disparities.
+
+        :return: (height, width) int32 array
+        :rtype: numpy.ndarray
+        """
+        return calc_disparities(cfg, screen_width, screen_height, self.z_mm)
@@ -0,0 +1,59 @@
+import threading
+import time
+import pygame
+
+
+class FontRegistry:
+    """
+    Process-wide registry of the loaded fonts: every (face, size) is loaded only once, since pygame.font.SysFont
+    may trigger an expensive scan of the system fonts.
+    """
+    _fonts = {}
+    _load_times_ms = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, face, size):
+        """
+        Return the font of the given face (None for the default font) and size, loading it if needed.
+
+        :rtype: pygame.font.Font
+        """
+        key = (face, size)
+        font = cls._fonts.get(key)
+        if font is not None:
+            return font
+        with cls._lock:
+            font = cls._fonts.get(key)
+            if font is None:
+                start = time.perf_counter()
+                font = pygame.font.SysFont(face, size)
+                cls._load_times_ms[key] = (time.perf_counter() - start) * 1000
+                cls._fonts[key] = font
+        return font
+
+    @classmethod
+    def warm_up(cls, font_specs):
+        """
+        Load the given (face, size) fonts in advance.
+        """
+        for face, size in font_specs:
+            cls.get(face, size)
+
+    @classmethod
+    def get_load_times(cls):
+        """
+        Return the load time in milliseconds of every font, keyed by "face:size".
+
+        :rtype: dict[str, float]
+        """
+        return {f"{face}:{size}": load_time_ms for (face, size), load_time_ms in cls._load_times_ms.items()}
+
+    @classmethod
+    def clear(cls):
+        """
+        Forget the loaded fonts, which are no longer valid after pygame.quit.
+        """
+        with cls._lock:
+            cls._fonts.clear()
+            cls._load_times_ms.clear()
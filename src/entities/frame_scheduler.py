@@ -0,0 +1,65 @@
+import time
+from entities.input_queue import InputQueue
+
+
+class FrameScheduler:
+    """
+    Decides when a frame must be rendered and paces the rendered frames.
+
+    With idle rendering, a frame is rendered only when a redraw has been requested (e.g. by an input event or
+    a change of the displayed timer): in the meantime the loop sleeps on pygame.event.wait instead of polling.
+    Rendered frames are capped at the target frame rate, which should match the display refresh rate.
+    While animating (e.g. with dynamic noise) every frame changes, so frames are rendered continuously at that rate.
+
+    The events are collected by an input queue also while waiting between frames, so their timestamps do not
+    depend on the frame rate.
+    """
+
+    def __init__(self, target_fps, idle_rendering):
+        self.target_fps = target_fps
+        self.idle_rendering = idle_rendering
+        self.input_queue = InputQueue()
+        self._redraw_requested = True
+        self._last_frame_time = None
+        self.animating = False
+
+    def request_redraw(self):
+        self._redraw_requested = True
+
+    def wait_events(self, timeout_sec):
+        """
+        Return the pending events. If idle rendering is enabled and no redraw is pending, sleep until the first
+        event or the timeout.
+
+        :param timeout_sec: maximum time to sleep, e.g. until the next scheduled change of the scene
+        :type timeout_sec: float
+        :return: the events, stamped by the input queue
+        :rtype: list[pygame.event.Event]
+        """
+        if self.idle_rendering and not self.animating and not self._redraw_requested and not self.input_queue:
+            self.input_queue.wait(timeout_sec)
+        else:
+            self.input_queue.poll()
+        return self.input_queue.drain()
+
+    def should_render(self):
+        """
+        Return True iff a frame must be rendered now, consuming the redraw request.
+        """
+        if not self.idle_rendering or self.animating:
+            return True
+        redraw_requested = self._redraw_requested
+        self._redraw_requested = False
+        return redraw_requested
+
+    def on_frame_rendered(self):
+        """
+        Wait as needed to keep the rendered frames at the target frame rate, collecting the events in the meantime.
+        """
+        now = time.perf_counter()
+        if self.target_fps and self._last_frame_time is not None:
+            frame_deadline = self._last_frame_time + 1 / self.target_fps
+            while now < frame_deadline:
+                self.input_queue.wait(frame_deadline - now)
+                now = time.perf_counter()
+        self._last_frame_time = now
@@ -0,0 +1,55 @@
+import time
+import pygame
+
+
+class InputQueue:
+    """
+    Collects the pygame events as soon as they are dequeued, stamping each one with a `timestamp` attribute
+    (time.perf_counter seconds), so that input timings do not depend on when the events are processed.
+
+    pygame events carry no timestamp of their own: to keep the stamps close to the actual input, the events must be
+    collected while waiting (e.g. between frames) instead of once per frame.
+    """
+
+    def __init__(self):
+        self._events = []
+
+    def __len__(self):
+        return len(self._events)
+
+    def poll(self):
+        """
+        Collect the events already available, without waiting.
+        """
+        events = pygame.event.get()
+        if events:
+            self._stamp(events)
+
+    def wait(self, timeout_sec):
+        """
+        Wait for an event at most for the given time, then collect it with the other available events.
+
+        :return: True iff an event has been collected
+        :rtype: bool
+        """
+        event = pygame.event.wait(max(1, int(timeout_sec * 1000)))
+        if event.type == pygame.NOEVENT:
+            return False
+        self._stamp([event] + pygame.event.get())
+        return True
+
+    def drain(self):
+        """
+        Return the collected events, in order, and clear the queue.
+
+        :rtype: list[pygame.event.Event]
+        """
+        events = self._events
+        self._events = []
+        return events
+
+    def _stamp(self, events):
+        timestamp = time.perf_counter()
+        for event in events:
+            event.timestamp = timestamp
+        self._events.extend(events)
@@ -0,0 +1,195 @@
+import contextlib
+import cProfile
+import csv
+import json
+import os
+import threading
+import time
+import numpy as np
+from utils import get_session_name
+
+
+class Instrumentation:
+    """
+    Opt-in collector of frame timings, phase timings, stimulus generation times and click-to-present latencies.
+    When disabled, every method is a no-op.
+
+    Durations are stored in milliseconds and exported per session to JSON (percentiles, histograms and raw traces)
+    and CSV (raw traces), named after the start of the session (see start).
+    """
+    FRAME = "frame"
+    STIMULUS_GENERATION = "stimulus_generation"
+    CLICK_TO_PRESENT = "click_to_present"
+    DYNAMIC_FRAME_GENERATION = "dynamic_frame_generation"
+
+    _PERCENTILES = (50, 95, 99)
+    # Histogram bucket edges in milliseconds
+    _HISTOGRAM_EDGES_MS = (0, 1, 2, 4, 8, 16.7, 33.3, 50, 100, 250, 500, 1000, float("inf"))
+
+    def __init__(self, enabled, export_dir):
+        self.enabled = enabled
+        self.export_dir = export_dir
+
+        self._lock = threading.Lock()
+        self._profiler = None
+        self.reset()
+
+    def reset(self):
+        """
+        Prepare a new session, discarding the collected data (e.g. the stimuli generated before it starts are
+        then measured).
+        """
+        self.session_name = None
+        self.traces = {}
+        self.counters = {}
+
+        self._last_frame_time = None
+        self._pending_click_time = None
+        self._profile_count = 0
+
+    def start(self):
+        """
+        Name the session after the current time: must be called when the session starts running.
+        """
+        self.session_name = get_session_name("session", self.export_dir, ".json")
+
+    def record(self, metric, duration_ms):
+        """
+        Record a duration of the given metric. Safe to call from worker threads.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.traces.setdefault(metric, []).append(duration_ms)
+
+    def measure(self, metric):
+        """
+        Context manager recording the duration of its block.
+        """
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._measure(metric)
+
+    @contextlib.contextmanager
+    def _measure(self, metric):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(metric, (time.perf_counter() - start) * 1000)
+
+    def set_counter(self, name, value):
+        if self.enabled:
+            self.counters[name] = value
+
+    def on_frame(self):
+        """
+        Record the duration since the previous frame. Must be called once per frame.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last_frame_time is not None:
+            self.record(self.FRAME, (now - self._last_frame_time) * 1000)
+        self._last_frame_time = now
+
+    def on_click(self, timestamp=None):
+        """
+        Start measuring the click-to-present latency.
+
+        :param timestamp: time.perf_counter time of the click, now if not given
+        :type timestamp: float
+        """
+        if self.enabled and self._pending_click_time is None:
+            self._pending_click_time = timestamp if timestamp is not None else time.perf_counter()
+
+    def on_present(self):
+        """
+        Record the click-to-present latency if a click is waiting for the new stimulus to be presented.
+        """
+        if self.enabled and self._pending_click_time is not None:
+            self.record(self.CLICK_TO_PRESENT, (time.perf_counter() - self._pending_click_time) * 1000)
+            self._pending_click_time = None
+
+    def toggle_profiler(self):
+        """
+        Start a cProfile capture, or stop the running one and dump it to the export directory.
+
+        :return: the path of the dumped profile, or None if a capture has just started
+        :rtype: str | None
+        """
+        if not self.enabled:
+            return None
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            return None
+        return self._stop_profiler()
+
+    def _stop_profiler(self):
+        self._profiler.disable()
+        if self.session_name is None:
+            self.start()
+        os.makedirs(self.export_dir, exist_ok=True)
+        self._profile_count += 1
+        path = os.path.join(self.export_dir, f"{self.session_name}_{self._profile_count}.prof")
+        self._profiler.dump_stats(path)
+        self._profiler = None
+        return path
+
+    def get_summary(self):
+        """
+        Return count, mean, max, percentiles and histogram of every metric.
+        """
+        summary = {}
+        for metric, durations in self.traces.items():
+            values = np.asarray(durations)
+            counts, _ = np.histogram(values, bins=self._HISTOGRAM_EDGES_MS)
+            percentiles = np.percentile(values, self._PERCENTILES)
+            summary[metric] = {
+                "count": len(values),
+                "mean_ms": float(values.mean()),
+                "max_ms": float(values.max()),
+                **{f"p{p}_ms": float(v) for p, v in zip(self._PERCENTILES, percentiles)},
+                "histogram": {
+                    "edges_ms": [str(edge) if np.isinf(edge) else edge for edge in self._HISTOGRAM_EDGES_MS],
+                    "counts": counts.tolist()
+                }
+            }
+        return summary
+
+    def export(self):
+        """
+        Export the session to <export_dir>/<session_name>.json and .csv.
+
+        :return: the paths of the exported files, or None if disabled
+        :rtype: tuple[str, str] | None
+        """
+        if not self.enabled:
+            return None
+        if self._profiler is not None:
+            self._stop_profiler()
+        if self.session_name is None:
+            # Never started, e.g. a replay driving the game without running it
+            self.start()
+
+        os.makedirs(self.export_dir, exist_ok=True)
+        json_path = os.path.join(self.export_dir, f"{self.session_name}.json")
+        csv_path = os.path.join(self.export_dir, f"{self.session_name}.csv")
+
+        with open(json_path, "w") as file:
+            json.dump({
+                "session": self.session_name,
+                "summary": self.get_summary(),
+                "counters": self.counters,
+                "traces": self.traces
+            }, file, indent=2)
+
+        with open(csv_path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["metric", "index", "duration_ms"])
+            for metric, durations in self.traces.items():
+                for index, duration in enumerate(durations):
+                    writer.writerow([metric, index, f"{duration:.4f}"])
+
+        return json_path, csv_path
@@ -1,6 +1,39 @@
+import contextlib
+import zlib
+import numpy as np
 import pygame
+from entities.instrumentation import Instrumentation
 from enums.layer_type import LayerType
 
+
+def pixels_to_surface(pixels, layer_type: LayerType):
+    """
+    Renders (height, width) layer intensities to a new surface, in the color channel of the layer type.
+    """
+    height, width = pixels.shape
+    # Surface arrays are indexed (x, y), while the intensities are indexed [y][x]
+    rgb = np.zeros((width, height, 3), dtype=np.uint8)
+    rgb[:, :, 0 if layer_type == LayerType.RED else 2] = pixels.T
+
+    surface = pygame.Surface((width, height))
+    pygame.surfarray.blit_array(surface, rgb)
+    return surface
+
+
+@contextlib.contextmanager
+def channel_view(surface, layer_type: LayerType):
+    """
+    Yields a writable (x, y) view of the surface color channel of the layer type.
+    The view locks the surface, which cannot be blitted until the view is released: it must not be kept after
+    the block (its variable is released at the latest when the calling function returns).
+    """
+    view = pygame.surfarray.pixels_red(surface) if layer_type == LayerType.RED else pygame.surfarray.pixels_blue(surface)
+    try:
+        yield view
+    finally:
+        del view
+
+
 # TODO separate enum
 # TODO extract from config width and similar parameters
 # TODO add a draw method
@@ -9,57 +42,134 @@ class Layer:
     RED_COLOR = (255, 0, 0)
     BLUE_COLOR = (0, 0, 255)
     
-    def __init__(self, config, layer_type: LayerType, width: int, height: int, square_size: int, disparity: int):
+    def __init__(self, config, layer_type: LayerType, width: int, height: int, square_size: int, disparity: int, instrumentation=None):
         self.layer_type = layer_type
         self.width = width  
         self.height = height
         self.square_size = square_size
         self.disparity = disparity
         self.surface = None
-        
+        self.square_rel_x = None
+        self.square_rel_y = None
+        self.instrumentation = instrumentation or Instrumentation(False, None)
+
+    def create_pixels(self, noise_matrix, square_rel_x: int, square_rel_y: int):
+        """
+        Build the layer intensities (noise and square) as a (height, width) uint8 array.
+
+        Note:
+        - the square is just a portion of the noise matrix
+        - in the red layer, the square starts from square_rel_x
+        - in the blue layer, the square is translated to square_rel_x + disparity, to recreate 3D effect
+        - in the blue layer, the pixels between square_rel_x and square_rel_x + disparity are copied from 
+          the red layer, so they are equal to the first disparity pixels of the square itself
+        - the pixels between square_rel_x + square_size and square_rel_x + square_size + disparity of the 
+          red layer are overridden by the square in the blue layer
+        """
+        noise = np.asarray(noise_matrix, dtype=np.uint8)
+        pixels = noise.copy()
+
+        region = self._get_square_region(square_rel_x, square_rel_y)
+        if region is not None:
+            y_start, y_end, x_start, x_end = region
+            # Shift the square to the right by the disparity
+            pixels[y_start:y_end, x_start:x_end] = noise[y_start:y_end, x_start - self.disparity:x_end - self.disparity]
+
+        return pixels
+
+    def _get_square_region(self, square_rel_x: int, square_rel_y: int):
+        """
+        Returns the (y_start, y_end, x_start, x_end) region where the layer differs from the noise, 
+        or None if the layer is plain noise (red layer, or square shifted outside the layer).
+        """
+        if self.layer_type != LayerType.BLUE:
+            return None
+        # The square in the blue layer is shifted by disparity and clipped to the layer width on both sides
+        # (a negative disparity may shift it past the left edge): its pixel x comes from x - disparity
+        x_start = max(square_rel_x + self.disparity, 0)
+        x_end = min(square_rel_x + self.disparity + self.square_size, self.width)
+        y_end = min(square_rel_y + self.square_size, self.height)
+        if x_start >= x_end or square_rel_y >= y_end:
+            return None
+        return square_rel_y, y_end, x_start, x_end
+
     def create_surface(self, noise_matrix, square_rel_x: int, square_rel_y: int):
         """Creates the layer surface with noise and square based on layer type"""
-        self.surface = pygame.Surface((self.width, self.height))
-        
-        for y in range(self.height):
-            for x in range(self.width):
-                val = noise_matrix[y][x]
-                
-                # Calculate square position based on layer type
-                adjusted_square_rel_x = square_rel_x
-                if self.layer_type == LayerType.BLUE:
-                    # The square in the blue layer is shifted by disparity
-                    adjusted_square_rel_x += self.disparity
-                
-                # Check if current pixel is inside the square
-                xy_is_inside_square = (
-                    adjusted_square_rel_x <= x < adjusted_square_rel_x + self.square_size and
-                    square_rel_y <= y < square_rel_y + self.square_size
-                )
-                
-                # Handle blue layer special case for disparity
-                if xy_is_inside_square and self.layer_type == LayerType.BLUE:
-                    # Note:
-                    # - the square is just a portion of the noise matrix
-                    # - in the red layer, the square starts from square_rel_x
-                    # - in the blue layer, the square is translated to square_rel_x + disparity, to recreate 3D effect
-                    # - in the blue layer, the pixels between square_rel_x and square_rel_x + disparity are copied from 
-                    #   the red layer, so they are equal to the first disparity pixels of the square itself
-                    # - the pixels between square_rel_x + square_size and square_rel_x + square_size + disparity of the 
-                    #   red layer are overridden by the square in the blue layer
-
-                    # Shift the square to the right by the disparity
-                    original_x = x - self.disparity
-                    if 0 <= original_x < self.width:
-                        val = noise_matrix[y][original_x]
-                
-                # Set pixel color based on layer type
-                if self.layer_type == LayerType.RED:
-                    self.surface.set_at((x, y), (val, 0, 0))
-                elif self.layer_type == LayerType.BLUE:
-                    self.surface.set_at((x, y), (0, 0, val))
-        
+        return self.set_surface(self.render_surface(noise_matrix, square_rel_x, square_rel_y), square_rel_x, square_rel_y)
+
+    def render_surface(self, noise_matrix, square_rel_x: int, square_rel_y: int):
+        """
+        Renders a new surface with noise and square, without changing the layer state.
+        Safe to call from a worker thread.
+        """
+        with self.instrumentation.measure(Instrumentation.STIMULUS_GENERATION):
+            pixels = self.create_pixels(noise_matrix, square_rel_x, square_rel_y)
+            surface = pixels_to_surface(pixels, self.layer_type)
+        return surface
+
+    def set_surface(self, surface, square_rel_x: int, square_rel_y: int):
+        """Adopts a surface rendered by render_surface for the given square position"""
+        self.surface = surface
+        self.square_rel_x = square_rel_x
+        self.square_rel_y = square_rel_y
+        return self.surface
+
+    def redraw_surface(self, noise_matrix, square_rel_x: int, square_rel_y: int):
+        """
+        Redraws the whole existing surface in place, e.g. with a new noise, without allocating a new surface.
+        Falls back to create_surface if the surface does not exist yet.
+        """
+        if self.surface is None:
+            return self.create_surface(noise_matrix, square_rel_x, square_rel_y)
+
+        with self.instrumentation.measure(Instrumentation.STIMULUS_GENERATION):
+            pixels = self.create_pixels(noise_matrix, square_rel_x, square_rel_y)
+            with channel_view(self.surface, self.layer_type) as channel:
+                channel[:] = pixels.T
+
+        self.square_rel_x = square_rel_x
+        self.square_rel_y = square_rel_y
+        return self.surface
+
+    def update_surface(self, noise_matrix, square_rel_x: int, square_rel_y: int):
+        """
+        Moves the square of the existing surface to a new position, touching only the old and new square regions.
+        The noise matrix must be the same used to create the surface.
+        Falls back to create_surface if the surface does not exist yet.
+        """
+        if self.surface is None:
+            return self.create_surface(noise_matrix, square_rel_x, square_rel_y)
+
+        with self.instrumentation.measure(Instrumentation.STIMULUS_GENERATION):
+            noise = np.asarray(noise_matrix, dtype=np.uint8)
+            old_region = self._get_square_region(self.square_rel_x, self.square_rel_y)
+            new_region = self._get_square_region(square_rel_x, square_rel_y)
+
+            if old_region is not None or new_region is not None:
+                with channel_view(self.surface, self.layer_type) as channel:
+                    # Surface arrays are indexed (x, y), so the channel view is transposed to match the noise matrix
+                    pixels = channel.T
+                    if old_region is not None:
+                        # Restore the old square (and its disparity strip) from the noise
+                        y_start, y_end, x_start, x_end = old_region
+                        pixels[y_start:y_end, x_start:x_end] = noise[y_start:y_end, x_start:x_end]
+                    if new_region is not None:
+                        y_start, y_end, x_start, x_end = new_region
+                        pixels[y_start:y_end, x_start:x_end] = noise[y_start:y_end, x_start - self.disparity:x_end - self.disparity]
+
+        self.square_rel_x = square_rel_x
+        self.square_rel_y = square_rel_y
         return self.surface
+
+    def get_checksum(self, value=0):
+        """
+        Returns the CRC-32 of the layer intensities, independent from the pixel format of the surface.
+
+        :param value: running checksum to continue, e.g. the one of the other layer
+        :type value: int
+        """
+        with channel_view(self.surface, self.layer_type) as channel:
+            return zlib.crc32(np.ascontiguousarray(channel.T), value)
     
     def get_color(self):
         """Returns the base color for this layer type"""
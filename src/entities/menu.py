@@ -1,13 +1,15 @@
 import pygame
+from entities.font_registry import FontRegistry
 
 
 BACKGROUND_COLOR = (15, 26, 33)
 MENU_Y = 200
-MENU_FPS = 30
 
 MENU_ITEM_SELECTED_COLOR = (255, 255, 0)
 MENU_ITEM_UNSELECTED_COLOR = (255, 255, 255)
 MENU_ITEM_FONT_SIZE = 48
+MENU_TITLE_FONT_SIZE = 48
+MENU_SUBTITLE_FONT_SIZE = 36
 MENU_ITEMS_SPACING = 60
 
 
@@ -26,54 +28,101 @@ class Menu:
         self.title = title
         self.subtitle = subtitle
 
-        self.font = pygame.font.SysFont(None, MENU_ITEM_FONT_SIZE)
-        self.title_font = pygame.font.SysFont(None, 48)
-        self.subtitle_font = pygame.font.SysFont(None, 36)
-        self.clock = pygame.time.Clock()
+        self.font = FontRegistry.get(None, MENU_ITEM_FONT_SIZE)
+        self.title_font = FontRegistry.get(None, MENU_TITLE_FONT_SIZE)
+        self.subtitle_font = FontRegistry.get(None, MENU_SUBTITLE_FONT_SIZE)
+
+        # The menu is static: render every text once, items in both selected and unselected colors
+        self.header_surfaces = self._render_header()
+        self.item_surfaces, self.item_rects = self._render_items()
+
+    def _render_header(self):
+        """
+        Render the title and subtitle lines.
+
+        :return: the (surface, rect) of every header line
+        :rtype: list[tuple[pygame.Surface, pygame.Rect]]
+        """
+        header_surfaces = []
+        y_offset = 100
+        if self.title:
+            title_text = self.title_font.render(self.title, True, (255, 255, 255))
+            title_rect = title_text.get_rect(center=(self.screen.get_width() // 2, y_offset))
+            header_surfaces.append((title_text, title_rect))
+            y_offset += 60
+        
+        if self.subtitle:
+            subtitle_lines = self.subtitle.split('\n')
+            for line in subtitle_lines:
+                subtitle_text = self.subtitle_font.render(line, True, (255, 255, 255))
+                subtitle_rect = subtitle_text.get_rect(center=(self.screen.get_width() // 2, y_offset))
+                header_surfaces.append((subtitle_text, subtitle_rect))
+                y_offset += 40  # Smaller spacing for subtitle lines
+
+        self.menu_y = y_offset + 40
+        return header_surfaces
+
+    def _render_items(self):
+        """
+        Render every item in both colors.
+
+        :return: the {item: {selected: surface}} surfaces and the {item: rect} rects of the items
+        :rtype: tuple[dict, dict]
+        """
+        item_surfaces = {}
+        item_rects = {}
+        for index, (item, option) in enumerate(self.items_dict.items()):
+            item_surfaces[item] = {
+                True: self.font.render(option, True, MENU_ITEM_SELECTED_COLOR),
+                False: self.font.render(option, True, MENU_ITEM_UNSELECTED_COLOR)
+            }
+            center = (self.screen.get_width() // 2, self.menu_y + index * MENU_ITEMS_SPACING)
+            # Selected and unselected surfaces have the same size, the rect covers both
+            item_rects[item] = item_surfaces[item][False].get_rect(center=center)
+        return item_surfaces, item_rects
 
     def show(self):
         keys = list(self.items_dict.keys())
         selected_item = keys[0]
+        self._draw(selected_item)
         while True:
-            # Handle events first
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return None
-                if event.type == pygame.KEYDOWN:
-                    index = keys.index(selected_item)
-                    if event.key == pygame.K_UP:
-                        selected_item = keys[(index - 1) % len(keys)]
-                    elif event.key == pygame.K_DOWN:
-                        selected_item = keys[(index + 1) % len(keys)]
-                    elif event.key == pygame.K_RETURN:
-                        if selected_item == self._EXIT_KEY:
-                            return None
-                        return selected_item
-
-            # Only draw if the window is still open
-            self.screen.fill(BACKGROUND_COLOR)
-            
-            y_offset = 100
-            if self.title:
-                title_text = self.title_font.render(self.title, True, (255, 255, 255))
-                title_rect = title_text.get_rect(center=(self.screen.get_width() // 2, y_offset))
-                self.screen.blit(title_text, title_rect)
-                y_offset += 60
-            
-            if self.subtitle:
-                subtitle_lines = self.subtitle.split('\n')
-                for line in subtitle_lines:
-                    subtitle_text = self.subtitle_font.render(line, True, (255, 255, 255))
-                    subtitle_rect = subtitle_text.get_rect(center=(self.screen.get_width() // 2, y_offset))
-                    self.screen.blit(subtitle_text, subtitle_rect)
-                    y_offset += 40  # Smaller spacing for subtitle lines
-            
-            menu_y = y_offset + 40
-            for index, (item, option) in enumerate(self.items_dict.items()):
-                color = MENU_ITEM_SELECTED_COLOR if item == selected_item else MENU_ITEM_UNSELECTED_COLOR
-                text = self.font.render(option, True, color)
-                rect = text.get_rect(center=(self.screen.get_width() // 2, menu_y + index * MENU_ITEMS_SPACING))
-                self.screen.blit(text, rect)
-
-            pygame.display.flip()
-            self.clock.tick(MENU_FPS)
+            # Block until the next event, the menu does not change in the meantime
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT:
+                return None
+            if event.type == pygame.WINDOWEXPOSED:
+                self._draw(selected_item)
+            if event.type == pygame.KEYDOWN:
+                index = keys.index(selected_item)
+                if event.key == pygame.K_UP:
+                    selected_item = self._change_selection(selected_item, keys[(index - 1) % len(keys)])
+                elif event.key == pygame.K_DOWN:
+                    selected_item = self._change_selection(selected_item, keys[(index + 1) % len(keys)])
+                elif event.key == pygame.K_RETURN:
+                    if selected_item == self._EXIT_KEY:
+                        return None
+                    return selected_item
+
+    def _draw(self, selected_item):
+        """
+        Draw the whole menu with the given item selected.
+        """
+        self.screen.fill(BACKGROUND_COLOR)
+        for surface, rect in self.header_surfaces:
+            self.screen.blit(surface, rect)
+        for item in self.items_dict.keys():
+            self.screen.blit(self.item_surfaces[item][item == selected_item], self.item_rects[item])
+        pygame.display.flip()
+
+    def _change_selection(self, old_item, new_item):
+        """
+        Redraw only the previously and newly selected items.
+
+        :return: the new selected item
+        """
+        if old_item != new_item:
+            for item, selected in ((old_item, False), (new_item, True)):
+                self.screen.fill(BACKGROUND_COLOR, self.item_rects[item])
+                self.screen.blit(self.item_surfaces[item][selected], self.item_rects[item])
+            pygame.display.update([self.item_rects[old_item], self.item_rects[new_item]])
+        return new_item
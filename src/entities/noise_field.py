@@ -0,0 +1,51 @@
+import secrets
+import numpy as np
+
+
+class NoiseField:
+    """
+    Seeded procedural noise for the layers.
+
+    The noise of every trial is derived from (seed, trial_index), so any stimulus can be reproduced 
+    exactly from the seed alone, without storing it.
+    """
+
+    def __init__(self, width: int, height: int, intensity: int, seed=None):
+        self.width = width
+        self.height = height
+        self.intensity = intensity
+        # Record the seed even when it is randomly chosen, to be able to reproduce the session
+        self.seed = seed if seed is not None else secrets.randbits(32)
+
+    def generate(self, trial_index: int = 0):
+        """
+        Generate the noise of a trial.
+
+        :return: (height, width) uint8 array with values in [0, intensity]
+        :rtype: numpy.ndarray
+        """
+        rng = np.random.default_rng(self._spawn(trial_index)[0])
+        return rng.integers(0, self.intensity, size=(self.height, self.width), endpoint=True, dtype=np.uint8)
+
+    def generate_frames(self, count: int, trial_index: int = 0):
+        """
+        Generate a sequence of noise frames for the dynamic random-dot stereograms, 
+        independent from the noise and the other random choices of the trial.
+
+        :return: (count, height, width) uint8 array with values in [0, intensity]
+        :rtype: numpy.ndarray
+        """
+        rng = np.random.default_rng(self._spawn(trial_index)[2])
+        return rng.integers(0, self.intensity, size=(count, self.height, self.width), endpoint=True, dtype=np.uint8)
+
+    def trial_rng(self, trial_index: int):
+        """
+        Random generator for the other random choices of a trial (e.g. the square position), 
+        independent from the noise stream.
+
+        :rtype: numpy.random.Generator
+        """
+        return np.random.default_rng(self._spawn(trial_index)[1])
+
+    def _spawn(self, trial_index):
+        return np.random.SeedSequence(self.seed, spawn_key=(trial_index,)).spawn(3)
@@ -0,0 +1,28 @@
+class NoiseRing:
+    """
+    Ring buffer of pre-generated noise frames for the dynamic random-dot stereograms.
+
+    The frames are generated once per session, so that every rendered frame only has to copy a ready frame
+    into the layers: generating the noise is much slower than a frame at the target frame rate.
+    """
+
+    def __init__(self, noise_field, frame_count: int, frames=None):
+        """
+        :param noise_field: noise field of the session, from which the frames are derived
+        :param frame_count: number of frames before the sequence repeats
+        :type frame_count: int
+        :param frames: the frames of the noise field if already generated (e.g. mapped from the stimulus bank)
+        """
+        self.frames = frames if frames is not None else noise_field.generate_frames(frame_count)
+        self.index = 0
+
+    def __len__(self):
+        return len(self.frames)
+
+    def next(self):
+        """
+        Return the next noise frame, as a (height, width) uint8 array.
+        """
+        frame = self.frames[self.index]
+        self.index = (self.index + 1) % len(self.frames)
+        return frame
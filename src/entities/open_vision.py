@@ -1,45 +1,73 @@
 import pygame
-from games.fusional_vergence_game import FusionalVergenceGame
-from entities.menu import Menu
+from games.base_game import GAME_FONT_SIZE, GAME_FONT_SMALL_SIZE
+from entities.font_registry import FontRegistry
+from entities.menu import Menu, MENU_ITEM_FONT_SIZE, MENU_SUBTITLE_FONT_SIZE, MENU_TITLE_FONT_SIZE
+from entities.results_store import ResultsWriter
+from entities.session_manager import SessionManager
 from enums.game_type import GameType
 from enums.summary_menu_item import SummaryMenuItem
 from strings import Strings
+from utils import set_display_mode
 
 
 class OpenVision:
+    # Every font used by the menus and the games
+    _FONT_SPECS = (
+        (None, MENU_ITEM_FONT_SIZE),
+        (None, MENU_TITLE_FONT_SIZE),
+        (None, MENU_SUBTITLE_FONT_SIZE),
+        (None, GAME_FONT_SIZE),
+        (None, GAME_FONT_SMALL_SIZE)
+    )
+
     def __init__(self, cfg):
         self.cfg = cfg
 
         pygame.init()
+        if self.cfg.warm_up_fonts:
+            FontRegistry.warm_up(self._FONT_SPECS)
 
-        self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        self.screen = set_display_mode(self.cfg, fullscreen=True)
         self.clock = pygame.time.Clock()
 
         self.menu = Menu(self.cfg, self.screen, items_enum=GameType)
+        self.session_manager = SessionManager(self.cfg, self.screen)
+        self.results_writer = ResultsWriter(self.cfg.results_db, self.cfg.results_fallback) if self.cfg.results_db else None
         self.game = None
 
     def start_game(self, game_type):
-        self.game = FusionalVergenceGame(self.cfg, self.screen, game_type)
-        self.game.run()
-
-        # Game over, show summary and handle choice
-        summary_menu = Menu(            
-            self.cfg, 
-            self.screen, 
-            items_enum=SummaryMenuItem, 
-            title=Strings.SUMMARY_MENU_TITLE, 
-            subtitle=f"{self.game._get_score_msg()}\n{self.game._get_break_recovery_cycles_msg()}"
-        )
-        choice = summary_menu.show()
-        if choice == SummaryMenuItem.RESTART:
-            self.start_game(game_type)
+        restart = True
+        while restart:
+            self.game = self.session_manager.acquire(game_type)
+            self.game.run()
+            if self.results_writer:
+                # Stored in background, before the game is reset for the next session
+                self.results_writer.submit(self.game.get_session_result())
+
+            # Game over, show summary and handle choice
+            summary_menu = Menu(            
+                self.cfg, 
+                self.screen, 
+                items_enum=SummaryMenuItem, 
+                title=Strings.SUMMARY_MENU_TITLE, 
+                subtitle=f"{self.game._get_score_msg()}\n{self.game._get_break_recovery_cycles_msg()}\n{self.game._get_reaction_time_msg()}\n{Strings.MSG_SEED.format(self.game.noise_field.seed)}"
+            )
+            # The summary texts are rendered, the game can be reset for the next session while the summary is visible
+            self.session_manager.prepare()
+            choice = summary_menu.show()
+            restart = choice == SummaryMenuItem.RESTART
 
     def run(self):
         running = True
         while running:
+            self.session_manager.prepare()
             game_type = self.menu.show()
             if game_type is None:
                 running = False
+                self.session_manager.close()
+                if self.results_writer:
+                    self.results_writer.close()
+                FontRegistry.clear()
                 pygame.quit()
             else:
                 self.start_game(game_type)
@@ -7,4 +7,11 @@ class Prism:
 
         self.current_min = initial_offset
         self.current_max = initial_offset
-        self.break_recovery_pairs = []
\ No newline at end of file
+        self.break_recovery_pairs = []
+        # Text of the break-recovery pairs, maintained incrementally as the pairs are added
+        self.break_recovery_text = ""
+
+    def add_break_recovery_pair(self, break_offset, recovery_offset):
+        self.break_recovery_pairs.append((break_offset, recovery_offset))
+        pair_text = f"{break_offset}-{recovery_offset}"
+        self.break_recovery_text = f"{self.break_recovery_text}, {pair_text}" if self.break_recovery_text else pair_text
@@ -0,0 +1,102 @@
+import numpy as np
+
+
+class QuestStaircase:
+    """
+    QUEST-style Bayesian staircase for the break threshold of a prism.
+
+    The posterior over the threshold is kept on a fine grid, and the next offset is the candidate offset with the
+    largest expected information about the threshold. The probabilities of a correct answer and their entropies,
+    for every (candidate offset, threshold), are precomputed once, so an update is a row addition and the choice
+    of the next offset is a couple of matrix-vector products.
+
+    The probability of finding the square at offset x with threshold t is a logistic function of x - t,
+    between the guess rate (random clicks on the square) and 1 - lapse rate.
+    """
+
+    def __init__(self, min_offset, max_offset, step, grid_step, slope, guess_rate, lapse_rate, prior_mean, prior_sd):
+        """
+        :param min_offset: minimum offset, and minimum threshold
+        :param max_offset: maximum offset, and maximum threshold
+        :param step: spacing of the candidate offsets, from min_offset
+        :param grid_step: spacing of the threshold grid of the posterior
+        :param slope: spread of the psychometric function, in offset units
+        :param guess_rate: probability of a correct answer without fusion
+        :param lapse_rate: probability of a wrong answer with fusion
+        :param prior_mean: mean of the Gaussian prior over the threshold
+        :param prior_sd: standard deviation of the Gaussian prior over the threshold
+        """
+        self.min_offset = min_offset
+        self.step = step
+        self.slope = slope
+        self.guess_rate = guess_rate
+        self.lapse_rate = lapse_rate
+
+        self.thresholds = np.arange(min_offset, max_offset + grid_step / 2, grid_step, dtype=np.float64)
+        self.candidates = np.arange(min_offset, max_offset + 1, step, dtype=np.int64)
+
+        p_correct = self._get_p_correct(self.candidates[:, np.newaxis])
+        self._p_correct = p_correct
+        self._log_p_correct = np.log(p_correct)
+        self._log_p_wrong = np.log1p(-p_correct)
+        self._entropy = self._binary_entropy(p_correct)
+
+        self.log_posterior = -0.5 * ((self.thresholds - prior_mean) / prior_sd) ** 2
+
+    def _get_p_correct(self, offsets):
+        """
+        Probability of a correct answer at the given offsets for every threshold of the grid.
+        """
+        p_seen = 1 / (1 + np.exp((offsets - self.thresholds) / self.slope))
+        return self.guess_rate + (1 - self.guess_rate - self.lapse_rate) * p_seen
+
+    @staticmethod
+    def _binary_entropy(p):
+        return -(p * np.log(p) + (1 - p) * np.log1p(-p))
+
+    def get_posterior(self):
+        """
+        Return the normalized posterior over the threshold grid.
+
+        :rtype: numpy.ndarray
+        """
+        posterior = np.exp(self.log_posterior - self.log_posterior.max())
+        return posterior / posterior.sum()
+
+    def update(self, offset, correct):
+        """
+        Update the posterior with the answer given at an offset.
+
+        :type offset: int
+        :type correct: bool
+        """
+        index, remainder = divmod(offset - self.min_offset, self.step)
+        if remainder == 0 and 0 <= index < len(self.candidates):
+            log_likelihood = self._log_p_correct[index] if correct else self._log_p_wrong[index]
+        else:
+            # Offset outside the candidate grid (e.g. the initial one): computed on the fly
+            p_correct = self._get_p_correct(offset)
+            log_likelihood = np.log(p_correct) if correct else np.log1p(-p_correct)
+        self.log_posterior += log_likelihood
+        # Keep the log posterior bounded, its normalization does not matter
+        self.log_posterior -= self.log_posterior.max()
+
+    def next_offset(self):
+        """
+        Return the candidate offset whose answer is expected to be the most informative about the threshold,
+        i.e. maximizing the mutual information between the answer and the threshold.
+
+        :rtype: int
+        """
+        posterior = self.get_posterior()
+        p_correct = self._p_correct @ posterior
+        information = self._binary_entropy(p_correct) - self._entropy @ posterior
+        return int(self.candidates[np.argmax(information)])
+
+    def get_threshold_estimate(self):
+        """
+        Return the posterior mean of the threshold.
+
+        :rtype: float
+        """
+        return float(self.thresholds @ self.get_posterior())
@@ -0,0 +1,295 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SessionResult:
+    """
+    Results of a session, as stored: break-recovery pairs and final offset per prism type.
+    """
+
+    def __init__(self, patient_id, started_at, game_type, seed, duration_sec, trials, median_reaction_time_ms, prisms):
+        """
+        :param started_at: start time of the session, in seconds since the epoch
+        :param prisms: {prism type value: (final offset, break-recovery pairs)}
+        :type prisms: dict[str, tuple[int, list[tuple[int, int]]]]
+        """
+        self.patient_id = patient_id
+        self.started_at = started_at
+        self.game_type = game_type
+        self.seed = seed
+        self.duration_sec = duration_sec
+        self.trials = trials
+        self.median_reaction_time_ms = median_reaction_time_ms
+        self.prisms = prisms
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a result from its to_dict representation, e.g. read back from JSON.
+        """
+        data = dict(data)
+        data["prisms"] = {
+            prism_type: (final_offset, [tuple(pair) for pair in pairs])
+            for prism_type, (final_offset, pairs) in data["prisms"].items()
+        }
+        return cls(**data)
+
+    @classmethod
+    def from_session(cls, patient_id, started_at, game_type, seed, duration_sec, session):
+        """
+        Create the result of a closed VergenceSession.
+        """
+        return cls(
+            patient_id,
+            started_at,
+            game_type.value,
+            seed,
+            duration_sec,
+            len(session.answers),
+            session.get_median_reaction_time_ms(),
+            {
+                prism_type.value: (prism.offset, list(prism.break_recovery_pairs))
+                for prism_type, prism in session.prism_dict.items()
+            }
+        )
+
+
+class ResultsStore:
+    """
+    SQLite store of the session results, in WAL mode so that queries do not block the writer.
+
+    The break-recovery pairs are stored per session and prism type together with their maximum break and recovery,
+    and the sessions are indexed by patient and start time, so that the trend queries of a patient do not depend
+    on the size of the whole history.
+    """
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY,
+            patient_id TEXT,
+            started_at REAL NOT NULL,
+            game_type TEXT NOT NULL,
+            seed INTEGER,
+            duration_sec REAL,
+            trials INTEGER,
+            median_reaction_time_ms REAL
+        );
+        CREATE INDEX IF NOT EXISTS sessions_patient_started_at ON sessions (patient_id, started_at);
+        CREATE TABLE IF NOT EXISTS prism_results (
+            session_id INTEGER NOT NULL REFERENCES sessions (id),
+            prism_type TEXT NOT NULL,
+            final_offset INTEGER,
+            max_break INTEGER,
+            max_recovery INTEGER,
+            break_recovery_pairs TEXT NOT NULL,
+            PRIMARY KEY (session_id, prism_type)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL is durable against application crashes and needs no fsync per transaction
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self._SCHEMA)
+
+    def add_sessions(self, results):
+        """
+        Store the given session results in a single transaction.
+
+        :type results: list[SessionResult]
+        """
+        with self.connection:
+            for result in results:
+                cursor = self.connection.execute(
+                    "INSERT INTO sessions (patient_id, started_at, game_type, seed, duration_sec, trials, median_reaction_time_ms) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (result.patient_id, result.started_at, result.game_type, result.seed, result.duration_sec,
+                     result.trials, result.median_reaction_time_ms)
+                )
+                self.connection.executemany(
+                    "INSERT INTO prism_results (session_id, prism_type, final_offset, max_break, max_recovery, break_recovery_pairs) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (cursor.lastrowid, prism_type, final_offset,
+                         max((pair[0] for pair in pairs), default=None),
+                         max((pair[1] for pair in pairs), default=None),
+                         json.dumps(pairs))
+                        for prism_type, (final_offset, pairs) in result.prisms.items()
+                    ]
+                )
+
+    def get_patients(self):
+        """
+        Return the patients with their number of sessions and the time of the last one.
+
+        :rtype: list[dict]
+        """
+        rows = self.connection.execute(
+            "SELECT patient_id, COUNT(*) AS sessions, MAX(started_at) AS last_started_at "
+            "FROM sessions GROUP BY patient_id ORDER BY patient_id"
+        )
+        return [dict(row) for row in rows]
+
+    def get_sessions(self, patient_id, since=None, limit=None):
+        """
+        Return the sessions of a patient, newest first, with their break-recovery pairs per prism type.
+
+        :param since: only the sessions started from this time, in seconds since the epoch
+        :rtype: list[dict]
+        """
+        sessions = [dict(row) for row in self.connection.execute(
+            "SELECT * FROM sessions WHERE patient_id IS ? AND started_at >= ? ORDER BY started_at DESC LIMIT ?",
+            (patient_id, since if since is not None else float("-inf"), limit if limit is not None else -1)
+        )]
+        for session in sessions:
+            session["prisms"] = {
+                row["prism_type"]: {
+                    "final_offset": row["final_offset"],
+                    "break_recovery_pairs": json.loads(row["break_recovery_pairs"])
+                }
+                for row in self.connection.execute(
+                    "SELECT prism_type, final_offset, break_recovery_pairs FROM prism_results WHERE session_id = ?",
+                    (session["id"],)
+                )
+            }
+        return sessions
+
+    def get_trends(self, patient_id, prism_type=None, since=None):
+        """
+        Return the maximum break and recovery of every session of a patient over time, oldest first.
+
+        :param prism_type: only this prism type value (e.g. "BASE_IN"), all the prism types if None
+        :param since: only the sessions started from this time, in seconds since the epoch
+        :return: rows of started_at, session_id, game_type, prism_type, max_break, max_recovery and final_offset
+        :rtype: list[dict]
+        """
+        query = (
+            "SELECT s.started_at, s.id AS session_id, s.game_type, p.prism_type, p.max_break, p.max_recovery, p.final_offset "
+            "FROM sessions s JOIN prism_results p ON p.session_id = s.id "
+            "WHERE s.patient_id IS ? AND s.started_at >= ? AND p.max_break IS NOT NULL"
+        )
+        parameters = [patient_id, since if since is not None else float("-inf")]
+        if prism_type is not None:
+            query += " AND p.prism_type = ?"
+            parameters.append(prism_type)
+        query += " ORDER BY s.started_at, p.prism_type"
+        return [dict(row) for row in self.connection.execute(query, parameters)]
+
+    def close(self):
+        self.connection.close()
+
+
+class ResultsWriter:
+    """
+    Stores the session results on a background thread, so that the game loop never waits for the database.
+    The results submitted while a write is in progress are stored together in the next transaction.
+
+    Storing never fails on the game side: if the database cannot be opened or written, the error is logged and
+    the results are appended to a JSONL fallback file instead, so that no session is lost. The writer keeps running
+    and reopens the database at the next write, first importing the results of the fallback file.
+    """
+    _STOP = object()
+
+    def __init__(self, path, fallback_path, batch_size=64):
+        """
+        :param path: path of the SQLite database, created if missing
+        :param fallback_path: path of the JSONL file the results are appended to when the database fails
+        :param batch_size: maximum number of results stored in a transaction
+        :type batch_size: int
+        """
+        self.path = path
+        self.fallback_path = fallback_path
+        self.batch_size = batch_size
+        # Last error of the database, if any
+        self.error = None
+        self._store = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="ResultsWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, result):
+        """
+        Queue a session result to be stored, without waiting.
+
+        :type result: SessionResult
+        """
+        self._queue.put(result)
+
+    def close(self):
+        """
+        Store the queued results and stop the writer.
+        """
+        if self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        stopped = False
+        while not stopped:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopped = self._STOP in batch
+            results = [result for result in batch if result is not self._STOP]
+            if results:
+                self._write(results)
+        if self._store is not None:
+            self._store.close()
+
+    def _write(self, results):
+        try:
+            # SQLite connections cannot be shared between threads: the writer owns its own
+            if self._store is None:
+                self._store = ResultsStore(self.path)
+                self._import_fallback()
+            self._store.add_sessions(results)
+            self.error = None
+        except Exception as error:
+            self.error = error
+            logger.exception("Cannot store %d session result(s) in %s, appending them to %s", len(results), self.path, self.fallback_path)
+            self._close_store()
+            self._append_fallback(results)
+
+    def _close_store(self):
+        if self._store is not None:
+            try:
+                self._store.close()
+            except Exception:
+                pass
+            self._store = None
+
+    def _import_fallback(self):
+        """
+        Store the results left in the fallback file by previous failures, then delete it.
+        """
+        if not os.path.isfile(self.fallback_path):
+            return
+        with open(self.fallback_path, "r", encoding="utf-8") as file:
+            results = [SessionResult.from_dict(json.loads(line)) for line in file if line.strip()]
+        self._store.add_sessions(results)
+        os.remove(self.fallback_path)
+        logger.info("Imported %d session result(s) from %s", len(results), self.fallback_path)
+
+    def _append_fallback(self, results):
+        lines = "".join(json.dumps(result.to_dict()) + "\n" for result in results)
+        try:
+            with open(self.fallback_path, "a", encoding="utf-8") as file:
+                file.write(lines)
+        except OSError:
+            # Last resort: the results are at least in the log
+            logger.exception("Cannot append the session results to %s, lost results: %s", self.fallback_path, lines)
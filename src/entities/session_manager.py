@@ -0,0 +1,65 @@
+import threading
+from enums.game_type import GameType
+from games.fusional_vergence_game import FusionalVergenceGame
+
+
+class SessionManager:
+    """
+    Prepares the stimuli of the next game in background while a menu is visible, so that a game starts in the next frame.
+    The game instance is built once and then reset for every session, reusing its buffers and surfaces.
+
+    The game, with its renderer and fonts, is built and reset on the main thread: SDL window, rendering and font
+    APIs must not be used from other threads (e.g. on macOS and with some Windows drivers). Only the NumPy part
+    of the reset (see FusionalVergenceGame.prepare_stimuli) runs in background.
+    """
+    # The game type is set when the game is acquired, the stimuli do not depend on it
+    _INITIAL_GAME_TYPE = GameType.BASE_IN
+
+    def __init__(self, cfg, screen):
+        self.cfg = cfg
+        self.screen = screen
+        self._game = None
+        self._thread = None
+        self._error = None
+
+    def prepare(self):
+        """
+        Start preparing the stimuli of the next game in background, if not already in progress.
+        Must be called from the main thread, which builds the game the first time.
+        """
+        if self._thread is not None:
+            return
+        if self._game is None:
+            self._game = FusionalVergenceGame(self.cfg, self.screen, self._INITIAL_GAME_TYPE, prepare_stimuli=False)
+        self._thread = threading.Thread(target=self._prepare_stimuli, name="SessionManager", daemon=True)
+        self._thread.start()
+
+    def acquire(self, game_type):
+        """
+        Return the prepared game for the given game type, waiting for its stimuli if needed.
+        Must be called from the main thread.
+
+        :rtype: FusionalVergenceGame
+        """
+        self.prepare()
+        self._thread.join()
+        self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        self._game.reset_session(game_type)
+        return self._game
+
+    def _prepare_stimuli(self):
+        try:
+            self._game.prepare_stimuli()
+        except Exception as error:
+            self._error = error
+
+    def close(self):
+        """
+        Wait for the game preparation in progress, if any.
+        """
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,136 @@
+import gzip
+import json
+import os
+from utils import get_session_name
+
+
+class SessionRecorder:
+    """
+    Opt-in recorder of a session as a compact event stream: a header with the seed, the game type, the screen size
+    and the configuration, one record per click (timestamp, position, stimulus checksum and prism transition)
+    and a final record with the session results. When disabled, every method is a no-op.
+
+    The records are kept in memory and exported at the end of the session to <export_dir>/<session_name>.jsonl.gz,
+    one JSON object per line, to be re-executed by the SessionReplayer.
+    """
+    FORMAT_VERSION = 1
+
+    HEADER = "header"
+    CLICK = "click"
+    END = "end"
+
+    def __init__(self, enabled, export_dir):
+        self.enabled = enabled
+        self.export_dir = export_dir
+        self.session_name = None
+        self.records = []
+
+    def start(self, cfg, screen_size, game_type, seed):
+        """
+        Start recording a new session, discarding the previous records.
+
+        :param screen_size: size of the screen, on which the disparity depends
+        :type screen_size: tuple[int, int]
+        """
+        if not self.enabled:
+            return
+        self.session_name = get_session_name("recording", self.export_dir, ".jsonl.gz")
+        self.records = [{
+            "type": self.HEADER,
+            "version": self.FORMAT_VERSION,
+            "seed": seed,
+            "game_type": game_type.value,
+            "screen_size": list(screen_size),
+            "config": dict(vars(cfg))
+        }]
+
+    def record_click(self, time_ms, pos, trial_index, checksum, correct, reaction_time_ms, prism, offset, next_offset, direction):
+        """
+        Record a click and the transition of the prism it answered.
+
+        :param time_ms: time of the click since the start of the session
+        :param pos: position of the click
+        :param checksum: checksum of the stimulus of the trial
+        :param prism: type of the prism answered
+        :param offset: offset of the prism when the click was given
+        :param next_offset: offset of the prism after the answer
+        :param direction: direction of the prism after the answer
+        """
+        if not self.enabled:
+            return
+        self.records.append({
+            "type": self.CLICK,
+            "t": round(time_ms, 3),
+            "pos": list(pos),
+            "trial": trial_index,
+            "checksum": checksum,
+            "correct": correct,
+            "rt": round(reaction_time_ms, 3) if reaction_time_ms is not None else None,
+            "prism": prism.value,
+            "offset": offset,
+            "next_offset": next_offset,
+            "direction": direction
+        })
+
+    def record_end(self, time_ms, session):
+        """
+        Record the results of the session (final offsets and break-recovery pairs).
+
+        :param session: the closed VergenceSession
+        """
+        if not self.enabled:
+            return
+        self.records.append({
+            "type": self.END,
+            "t": round(time_ms, 3),
+            "prisms": get_session_results(session)
+        })
+
+    def export(self):
+        """
+        Export the records to <export_dir>/<session_name>.jsonl.gz.
+
+        :return: the path of the exported file, or None if disabled or not started
+        :rtype: str | None
+        """
+        if not self.enabled or self.session_name is None:
+            return None
+        os.makedirs(self.export_dir, exist_ok=True)
+        path = os.path.join(self.export_dir, f"{self.session_name}.jsonl.gz")
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            for record in self.records:
+                file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        return path
+
+
+def get_session_results(session):
+    """
+    Return the final offset and the break-recovery pairs of every prism of a session, as recorded.
+
+    :rtype: dict
+    """
+    return {
+        prism_type.value: {
+            "offset": prism.offset,
+            "break_recovery_pairs": [list(pair) for pair in prism.break_recovery_pairs]
+        }
+        for prism_type, prism in session.prism_dict.items()
+    }
+
+
+def load_recording(path):
+    """
+    Load a recording exported by SessionRecorder.
+
+    :return: the header, the click records and the end record (None if missing)
+    :rtype: tuple[dict, list[dict], dict | None]
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    if not records or records[0].get("type") != SessionRecorder.HEADER:
+        raise ValueError(f"{path} is not a session recording")
+    if records[0]["version"] != SessionRecorder.FORMAT_VERSION:
+        raise ValueError(f"Unsupported recording version {records[0]['version']}")
+    clicks = [record for record in records if record["type"] == SessionRecorder.CLICK]
+    end = next((record for record in records if record["type"] == SessionRecorder.END), None)
+    return records[0], clicks, end
@@ -0,0 +1,121 @@
+import time
+import pygame
+from config.config import Config
+from entities.session_recorder import get_session_results, load_recording
+from enums.game_type import GameType
+from games.fusional_vergence_game import FusionalVergenceGame
+
+
+class ReplayResult:
+    def __init__(self, clicks, frames, elapsed_sec, mismatches):
+        self.clicks = clicks
+        self.frames = frames
+        self.elapsed_sec = elapsed_sec
+        self.mismatches = mismatches
+
+    @property
+    def ok(self):
+        return not self.mismatches
+
+
+class SessionReplayer:
+    """
+    Re-executes a session recorded by SessionRecorder through FusionalVergenceGame, feeding the recorded clicks
+    to its input handling, and reports every difference from the recording: stimulus checksums, answers,
+    prism transitions and final results.
+
+    The replay runs at maximum speed or paced on the recorded timestamps, optionally rendering the frames
+    (e.g. to benchmark the rendering on real traces).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.header, self.clicks, self.end = load_recording(path)
+        self.screen_size = tuple(self.header["screen_size"])
+        self.game_type = GameType(self.header["game_type"])
+        self.cfg = self._create_config()
+
+    def _create_config(self):
+        cfg = Config()
+        vars(cfg).update(self.header["config"])
+        cfg.noise_seed = self.header["seed"]
+        # A replay must not be recorded again
+        cfg.record_sessions = False
+        cfg.instrumentation = False
+        return cfg
+
+    def replay(self, screen, speed=0, render=False):
+        """
+        Replay the session on the given screen, which must have the recorded size.
+
+        :param speed: playback speed w.r.t. the recorded timestamps (e.g. 1 for real speed), 0 for maximum speed
+        :type speed: float
+        :param render: render a frame before every click, and the frames between clicks when paced
+        :type render: bool
+        :rtype: ReplayResult
+        """
+        if screen.get_size() != self.screen_size:
+            raise ValueError(f"The session was recorded on a {self.screen_size[0]}x{self.screen_size[1]} screen")
+
+        game = FusionalVergenceGame(self.cfg, screen, self.game_type)
+        mismatches = []
+        frames = 0
+
+        if game.stimulus_producer:
+            game.stimulus_producer.start()
+        game.renderer.invalidate()
+        game.start_ticks = pygame.time.get_ticks()
+        game.start_time = start = time.perf_counter()
+        try:
+            for index, click in enumerate(self.clicks):
+                if speed:
+                    frames += self._wait_until(game, start + click["t"] / 1000 / speed, render)
+                if render:
+                    game._draw_scene()
+                    frames += 1
+
+                prism = game.session.get_current_prism()
+                replayed = {"prism": prism.prism_type.value, "offset": prism.offset}
+                if click["checksum"] is not None:
+                    replayed["checksum"] = game.get_stimulus_checksum()
+
+                event = pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=tuple(click["pos"]), button=1, timestamp=time.perf_counter())
+                game._handle_input([event])
+
+                replayed.update(correct=game.last_correct, next_offset=prism.offset, direction=prism.direction)
+                mismatches.extend(
+                    f"click {index} (trial {click['trial']}): {name} recorded {click[name]}, replayed {value}"
+                    for name, value in replayed.items() if click[name] != value
+                )
+        finally:
+            if game.stimulus_producer:
+                game.stimulus_producer.stop()
+        elapsed_sec = time.perf_counter() - start
+
+        game.session.close_break_recovery_cycles()
+        if self.end is not None:
+            results = get_session_results(game.session)
+            if results != self.end["prisms"]:
+                mismatches.append(f"results: recorded {self.end['prisms']}, replayed {results}")
+
+        game.instrumentation.export()
+        return ReplayResult(len(self.clicks), frames, elapsed_sec, mismatches)
+
+    @staticmethod
+    def _wait_until(game, deadline, render):
+        """
+        Wait until the deadline, rendering frames at the target frame rate in the meantime if requested.
+
+        :return: the number of rendered frames
+        :rtype: int
+        """
+        frames = 0
+        frame_interval = 1 / game.cfg.target_fps if game.cfg.target_fps else 0
+        while (remaining := deadline - time.perf_counter()) > 0:
+            if render and remaining > frame_interval:
+                game._draw_scene()
+                game.scheduler.on_frame_rendered()
+                frames += 1
+            else:
+                time.sleep(remaining)
+        return frames
@@ -0,0 +1,59 @@
+import numpy as np
+from entities.layer import pixels_to_surface
+from enums.layer_type import LayerType
+
+
+class StereogramEngine:
+    """
+    Builds the red and blue layers of a random-dot stereogram from a per-pixel disparity map (e.g. from a DepthMap),
+    in a single vectorized pass.
+
+    The red layer is the noise itself, in the blue layer every pixel of the noise is shifted to the right by its
+    disparity (to the left if negative). Where pixels overlap, the nearest one (largest disparity) is visible,
+    including the unshifted pixels of the screen plane (e.g. a target behind the screen is hidden by the background).
+    The cost depends on the number of shifted pixels, not on the number or the shape of the targets.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+
+    def create_pixels(self, noise_matrix, disparity_map):
+        """
+        Build the intensities of the layers.
+
+        :param noise_matrix: (height, width) noise intensities
+        :param disparity_map: (height, width) integer disparities, in pixels
+        :return: the red and blue layer intensities, as (height, width) uint8 arrays
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        noise = np.asarray(noise_matrix, dtype=np.uint8)
+        disparity_map = np.asarray(disparity_map)
+        blue_pixels = noise.copy()
+
+        rows, cols = np.nonzero(disparity_map)
+        disparities = disparity_map[rows, cols].astype(np.int64)
+        shifted_cols = cols + disparities
+        visible = (shifted_cols >= 0) & (shifted_cols < self.width)
+        rows, cols, shifted_cols, disparities = rows[visible], cols[visible], shifted_cols[visible], disparities[visible]
+
+        # Depth buffer of the disparity visible at every destination: the unshifted pixels stay in place at
+        # disparity 0, the destinations left by the shifted pixels are empty until a shifted pixel lands there
+        depth = np.where(disparity_map == 0, 0, np.iinfo(np.int64).min).astype(np.int64).ravel()
+        destinations = rows * self.width + shifted_cols
+        np.maximum.at(depth, destinations, disparities)
+
+        # Pixels of the same row and disparity never share a destination, so exactly one shifted pixel matches
+        # the depth of a destination where it is visible
+        nearest = disparities == depth[destinations]
+        blue_pixels[rows[nearest], shifted_cols[nearest]] = noise[rows[nearest], cols[nearest]]
+        return noise, blue_pixels
+
+    def render_surfaces(self, noise_matrix, disparity_map):
+        """
+        Render the red and blue layer surfaces. Safe to call from a worker thread.
+
+        :rtype: tuple[pygame.Surface, pygame.Surface]
+        """
+        red_pixels, blue_pixels = self.create_pixels(noise_matrix, disparity_map)
+        return pixels_to_surface(red_pixels, LayerType.RED), pixels_to_surface(blue_pixels, LayerType.BLUE)
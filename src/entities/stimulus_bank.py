@@ -0,0 +1,316 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+class StimulusBank:
+    """
+    On-disk bank of pre-generated noise, mapped read-only (numpy memmaps) instead of being generated at the start
+    of a session: the noise of the first trial and the frames of the dynamic noise, by far the slowest part
+    of the startup for large layers.
+
+    The noise depends only on the grid size, the intensity and the seed, so the entries are stored as
+    <path>/<key>/<seed>/<name>.npy, where the key is a hash of the grid size and the intensity.
+    The files are written atomically. An index of the seeds (<path>/index.json) keeps their size and last use:
+    when the bank exceeds its maximum size, the least recently used seeds are evicted with all their files.
+    The index is updated under a lock file (<path>/index.lock), so that several processes can share the bank.
+
+    The sessions without a fixed seed use the bank only if it holds at least min_seeds seeds for their noise,
+    and rotate through them least recently used first, so that the patterns are not seen again soon enough to be
+    memorized.
+
+    When the path is None, the bank is disabled: it is always empty and stores nothing.
+    """
+    FORMAT_VERSION = 1
+    INDEX_FILE_NAME = "index.json"
+    LOCK_FILE_NAME = "index.lock"
+
+    NOISE = "noise"
+    FRAMES = "frames_{}"
+
+    def __init__(self, path, max_size_mb, min_seeds=1):
+        """
+        :param path: directory of the bank, created when the first entry is stored
+        :param max_size_mb: maximum size of the bank, in MB
+        :param min_seeds: minimum number of banked seeds for a noise, for the sessions without a fixed seed to use them
+        :type min_seeds: int
+        """
+        self.path = path
+        self.max_size_mb = max_size_mb
+        self.min_seeds = min_seeds
+        # {"<key>/<seed>": {"names": [...], "size": bytes, "last_used": time}}, loaded when first needed
+        self._index = None
+        # True while this instance holds the lock of the index
+        self._index_locked = False
+
+    @classmethod
+    def get_key(cls, width, height, intensity):
+        """
+        Return the key of the noise fields of the given grid size and intensity.
+
+        :rtype: str
+        """
+        fields = {"version": cls.FORMAT_VERSION, "width": width, "height": height, "intensity": intensity}
+        return hashlib.sha1(json.dumps(fields, sort_keys=True).encode()).hexdigest()[:16]
+
+    def get_seeds(self, width, height, intensity, frame_count=0):
+        """
+        Return the seeds banked for the given noise fields, with their dynamic frames if frame_count > 0,
+        least recently used first.
+
+        :rtype: list[int]
+        """
+        if self.path is None:
+            return []
+        prefix = self.get_key(width, height, intensity) + "/"
+        names = {self.NOISE} | ({self.FRAMES.format(frame_count)} if frame_count > 0 else set())
+        entries = [
+            (entry["last_used"], int(entry_key[len(prefix):]))
+            for entry_key, entry in self._get_index().items()
+            if entry_key.startswith(prefix) and names <= set(entry["names"])
+        ]
+        return [seed for _, seed in sorted(entries)]
+
+    def choose_seed(self, width, height, intensity, frame_count=0):
+        """
+        Return the least recently used banked seed for the given noise fields, or None if the bank holds less than
+        min_seeds of them.
+
+        :rtype: int | None
+        """
+        seeds = self.get_seeds(width, height, intensity, frame_count)
+        return seeds[0] if seeds and len(seeds) >= self.min_seeds else None
+
+    def get_noise(self, noise_field):
+        """
+        Return the banked noise of the first trial of the noise field, as a read-only memmap, or None if missing.
+        Marks the seed as used, for the rotation and the eviction.
+        """
+        return self._load(noise_field, self.NOISE, mark_used=True)
+
+    def get_frames(self, noise_field, count):
+        """
+        Return the banked dynamic noise frames of the noise field, as a read-only memmap, or None if missing.
+        The seed is not marked as used again: its noise is always loaded first.
+        """
+        return self._load(noise_field, self.FRAMES.format(count), mark_used=False)
+
+    def build(self, noise_field, frame_count=0):
+        """
+        Generate and store the noise of the noise field (and its dynamic frames if frame_count > 0) if missing,
+        then evict the least recently used seeds above the maximum size.
+
+        :return: the size of the stored files, in bytes
+        :rtype: int
+        """
+        if self.path is None:
+            return 0
+        entry_key = self._get_entry_key(noise_field)
+        entry = self._get_index().get(entry_key, {"names": []})
+        arrays = {self.NOISE: lambda: noise_field.generate(0)}
+        if frame_count > 0:
+            arrays[self.FRAMES.format(frame_count)] = lambda: noise_field.generate_frames(frame_count)
+        stored = {name: self._store(noise_field, name, generate()) for name, generate in arrays.items() if name not in entry["names"]}
+
+        def add_entry(index):
+            changed = entry_key not in index
+            entry = index.setdefault(entry_key, {"names": [], "size": 0, "last_used": time.time()})
+            for name, size in stored.items():
+                if name not in entry["names"]:
+                    entry["names"].append(name)
+                    entry["size"] += size
+                    changed = True
+            return self._evict(index) > 0 or changed
+
+        self._update_index(add_entry)
+        return sum(stored.values())
+
+    def get_size(self):
+        """
+        Return the size of the bank, in bytes.
+
+        :rtype: int
+        """
+        return sum(entry["size"] for entry in self._get_index().values())
+
+    def evict(self):
+        """
+        Delete the least recently used seeds until the bank fits its maximum size.
+
+        :return: the number of deleted seeds
+        :rtype: int
+        """
+        if self.path is None or not os.path.isdir(self.path):
+            return 0
+        deleted = []
+
+        def evict(index):
+            deleted.append(self._evict(index))
+            return deleted[0] > 0
+
+        self._update_index(evict)
+        return deleted[0]
+
+    def reindex(self):
+        """
+        Rebuild the index from the files of the bank, e.g. if it is missing or was overwritten by another process.
+        The last use of every seed is the modification time of its newest file.
+
+        :return: the number of indexed seeds
+        :rtype: int
+        """
+        index = {}
+        if self.path is not None and os.path.isdir(self.path):
+            for key in os.listdir(self.path):
+                key_dir = os.path.join(self.path, key)
+                if not os.path.isdir(key_dir):
+                    continue
+                for seed in os.listdir(key_dir):
+                    seed_dir = os.path.join(key_dir, seed)
+                    file_names = [file_name for file_name in os.listdir(seed_dir) if file_name.endswith(".npy")] if seed.isdigit() else []
+                    if not file_names:
+                        continue
+                    stats = [os.stat(os.path.join(seed_dir, file_name)) for file_name in file_names]
+                    index[f"{key}/{seed}"] = {
+                        "names": [file_name[:-len(".npy")] for file_name in file_names],
+                        "size": sum(stat.st_size for stat in stats),
+                        "last_used": max(stat.st_mtime for stat in stats)
+                    }
+        if self.path is not None and os.path.isdir(self.path):
+            with self._lock_index():
+                self._index = index
+                self._save_index()
+        else:
+            self._index = index
+        return len(index)
+
+    def _evict(self, index):
+        size = sum(entry["size"] for entry in index.values())
+        max_size = self.max_size_mb * 1024 * 1024
+        deleted = 0
+        for entry_key, entry in sorted(index.items(), key=lambda item: item[1]["last_used"]):
+            if size <= max_size:
+                break
+            shutil.rmtree(os.path.join(self.path, entry_key), ignore_errors=True)
+            del index[entry_key]
+            size -= entry["size"]
+            deleted += 1
+        return deleted
+
+    def _get_entry_key(self, noise_field):
+        return f"{self.get_key(noise_field.width, noise_field.height, noise_field.intensity)}/{noise_field.seed}"
+
+    def _get_path(self, noise_field, name):
+        return os.path.join(self.path, self._get_entry_key(noise_field), f"{name}.npy")
+
+    def _get_index(self):
+        if self.path is None:
+            return {}
+        if self._index is None:
+            try:
+                with open(os.path.join(self.path, self.INDEX_FILE_NAME), "r", encoding="utf-8") as file:
+                    self._index = json.load(file)
+            except (FileNotFoundError, ValueError):
+                # New bank, bank built before the index or damaged index: the files are scanned once
+                self.reindex()
+        return self._index
+
+    def _update_index(self, update):
+        """
+        Re-read the index under the lock, as other processes (e.g. the build tool while a session runs) may have
+        changed it, apply the update and save it if the update returns True (changed).
+        """
+        with self._lock_index():
+            self._index = None
+            if update(self._get_index()):
+                self._save_index()
+
+    @contextlib.contextmanager
+    def _lock_index(self):
+        if self._index_locked:
+            # Already held, e.g. when the index re-read by an update is rebuilt by reindex
+            yield
+            return
+        try:
+            file = open(os.path.join(self.path, self.LOCK_FILE_NAME), "a+b")
+        except OSError:
+            # E.g. a read-only bank, whose index cannot be saved anyway
+            logger.warning("Cannot lock the stimulus bank index in %s", self.path, exc_info=True)
+            yield
+            return
+        with file:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            else:
+                # Locks the first byte, retrying for 10 seconds before raising OSError
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            self._index_locked = True
+            try:
+                yield
+            finally:
+                self._index_locked = False
+                if fcntl is not None:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+                else:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _save_index(self):
+        path = os.path.join(self.path, self.INDEX_FILE_NAME)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(self._index, file)
+            os.replace(temp_path, path)
+        except OSError:
+            # E.g. a read-only bank: it can still be used, without rotation nor eviction
+            logger.warning("Cannot save the stimulus bank index %s", path, exc_info=True)
+
+    def _load(self, noise_field, name, mark_used):
+        if self.path is None:
+            return None
+        entry_key = self._get_entry_key(noise_field)
+        entry = self._get_index().get(entry_key)
+        if entry is None or name not in entry["names"]:
+            return None
+        try:
+            array = np.load(self._get_path(noise_field, name), mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            # Evicted in the meantime by another process
+            self._update_index(lambda index: index.pop(entry_key, None) is not None)
+            return None
+
+        if mark_used:
+            def mark_entry_used(index):
+                if entry_key not in index:
+                    return False
+                index[entry_key]["last_used"] = time.time()
+                return True
+
+            self._update_index(mark_entry_used)
+        return array
+
+    def _store(self, noise_field, name, array):
+        path = self._get_path(noise_field, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside and renamed, so that a file is never mapped while incomplete
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as file:
+            np.save(file, array)
+        os.replace(temp_path, path)
+        return os.path.getsize(path)
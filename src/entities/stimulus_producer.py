@@ -0,0 +1,108 @@
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Trial:
+    def __init__(self, trial_index, square_rel_x, square_rel_y, noise_matrix, red_layer_surface, blue_layer_surface):
+        self.trial_index = trial_index
+        self.square_rel_x = square_rel_x
+        self.square_rel_y = square_rel_y
+        self.noise_matrix = noise_matrix
+        self.red_layer_surface = red_layer_surface
+        self.blue_layer_surface = blue_layer_surface
+
+
+class StimulusProducer:
+    """
+    Pre-generates the next trials on a worker thread, so that the click handler only has to pop a ready trial.
+    Trials are produced in order of trial index, so that every trial is reproducible from its index.
+
+    pop() never waits: if the trial is not ready (a miss), it returns None and the caller builds the trial itself,
+    while the worker skips to the trials after it. If the creation of a trial fails, the worker stops and the error
+    is kept in `error` and logged: every pop() then returns None.
+    """
+    _PUT_TIMEOUT_SEC = 0.1
+
+    def __init__(self, create_trial, first_trial_index, depth):
+        """
+        :param create_trial: callable returning the Trial of a given trial index, must be thread-safe
+        :param first_trial_index: index of the first trial to produce
+        :type first_trial_index: int
+        :param depth: maximum number of trials kept ready
+        :type depth: int
+        """
+        self.create_trial = create_trial
+        self.depth = depth
+        self.miss_count = 0
+        self.hit_count = 0
+        self.error = None
+
+        self._next_trial_index = first_trial_index
+        # Index of the first trial still wanted, raised by pop() on a miss so that the worker catches up
+        self._min_trial_index = first_trial_index
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name="StimulusProducer", daemon=True)
+
+    @property
+    def queue_depth(self):
+        """Number of trials currently ready"""
+        return self._queue.qsize()
+
+    @property
+    def running(self):
+        return self._thread.is_alive() and not self._stop_event.is_set()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def pop(self, trial_index):
+        """
+        Returns the given trial if ready, discarding the older ones, without waiting.
+
+        :param trial_index: index of the wanted trial, increasing between calls
+        :type trial_index: int
+        :return: the trial, or None if it is not ready (a miss) or the producer is not running (stopped or failed)
+        :rtype: Trial | None
+        """
+        self._min_trial_index = trial_index + 1
+        while True:
+            try:
+                trial = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            # Older trials were built by the caller on a previous miss
+            if trial.trial_index == trial_index:
+                self.hit_count += 1
+                return trial
+        if self.running:
+            self.miss_count += 1
+        # The wanted trial may still be under construction: the worker discards it (see _produce)
+        return None
+
+    def _produce(self):
+        while not self._stop_event.is_set():
+            # The trials already built by the caller on a miss are skipped
+            self._next_trial_index = max(self._next_trial_index, self._min_trial_index)
+            try:
+                trial = self.create_trial(self._next_trial_index)
+            except Exception as error:
+                self.error = error
+                logger.exception("Failed to pre-generate trial %d, the next trials are generated on click", self._next_trial_index)
+                return
+            self._next_trial_index += 1
+            # Wait for a free slot, periodically checking if the producer has been stopped or the trial is no longer wanted
+            while not self._stop_event.is_set() and trial.trial_index >= self._min_trial_index:
+                try:
+                    self._queue.put(trial, timeout=self._PUT_TIMEOUT_SEC)
+                    break
+                except queue.Full:
+                    continue
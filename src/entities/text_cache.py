@@ -0,0 +1,34 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    """
+    Bounded LRU cache of rendered text surfaces, keyed by (font, text, color).
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        """
+        Return the antialiased surface of the text, rendering it only if not cached.
+        """
+        key = (font, text, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_size:
+            # Evict the least recently used surface
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def __len__(self):
+        return len(self._surfaces)
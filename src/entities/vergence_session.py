@@ -0,0 +1,144 @@
+import statistics
+from entities.prism import Prism
+from entities.quest_staircase import QuestStaircase
+from enums.game_type import GameType
+from enums.prism_type import PrismType
+from enums.staircase_type import StaircaseType
+
+
+class Answer:
+    """
+    Answer given in a trial, with the offset of the prism at the time of the answer.
+    """
+
+    def __init__(self, prism_type, offset, correct, reaction_time_ms):
+        self.prism_type = prism_type
+        self.offset = offset
+        self.correct = correct
+        self.reaction_time_ms = reaction_time_ms
+
+
+class VergenceSession:
+    """
+    Trial logic of a fusional vergence session: prism offsets, directions and break-recovery cycles.
+    It does not depend on pygame, so it can be driven by the game as well as by headless simulations.
+    """
+
+    def __init__(self, cfg, game_type):
+        self.cfg = cfg
+        self.game_type = game_type
+
+        self.prism_dict = {
+            PrismType.BASE_IN: Prism(PrismType.BASE_IN, self.cfg.initial_offset),
+            PrismType.BASE_OUT: Prism(PrismType.BASE_OUT, self.cfg.initial_offset)
+        }
+
+        if self.game_type == GameType.BASE_IN:
+            self.current_prism_type = PrismType.BASE_IN
+        elif self.game_type == GameType.BASE_OUT:
+            self.current_prism_type = PrismType.BASE_OUT
+        else:
+            self.current_prism_type = PrismType.BASE_IN
+
+        self.answers = []
+
+        self.staircases = None
+        if StaircaseType(self.cfg.staircase) == StaircaseType.QUEST:
+            # Without fusion, the square is found only by clicking on it by chance
+            guess_rate = self.cfg.square_size ** 2 / (self.cfg.layer_width * self.cfg.layer_height)
+            self.staircases = {
+                prism_type: QuestStaircase(
+                    self.cfg.min_offset, self.cfg.max_offset, self.cfg.step, self.cfg.quest_grid_step,
+                    self.cfg.quest_slope, guess_rate, self.cfg.quest_lapse_rate,
+                    self.cfg.initial_offset, self.cfg.quest_prior_sd
+                )
+                for prism_type in self.prism_dict
+            }
+
+    def get_current_prism(self):
+        return self.prism_dict[self.current_prism_type]
+
+    def get_signed_offset(self):
+        """
+        Return the offset of the current prism, negative for base-in.
+        """
+        if self.current_prism_type == PrismType.BASE_IN:
+            return -self.prism_dict[PrismType.BASE_IN].offset
+        return self.prism_dict[PrismType.BASE_OUT].offset
+
+    def register_answer(self, correct, reaction_time_ms=None):
+        """
+        Update the current prism after an answer and move to the next prism if needed.
+
+        :param correct: True iff the square has been found
+        :type correct: bool
+        :param reaction_time_ms: time from the presentation of the stimulus to the answer, if known
+        :type reaction_time_ms: float
+        """
+        prism = self.get_current_prism()
+        self.answers.append(Answer(prism.prism_type, prism.offset, correct, reaction_time_ms))
+        if self.staircases is not None:
+            self._register_quest_answer(prism, correct)
+        elif correct:
+            if not prism.direction:  # Was decreasing, now increasing: save the break-recovery cycle and reset min/max
+                prism.add_break_recovery_pair(prism.current_max, prism.current_min)
+                prism.current_min = prism.offset
+                prism.current_max = prism.offset
+            prism.direction = True
+            # Increase offset and update max
+            if prism.offset < self.cfg.max_offset:
+                prism.offset += self.cfg.step
+                prism.current_max = prism.offset
+        else:
+            prism.direction = False
+            # Decrease offset and update min
+            if prism.offset > self.cfg.min_offset:
+                prism.offset -= self.cfg.step
+                prism.current_min = prism.offset
+
+        # Alternate current_prism for JUMP_DUCTION
+        if self.game_type == GameType.JUMP_DUCTION:
+            self.current_prism_type = (
+                PrismType.BASE_IN if self.current_prism_type == PrismType.BASE_OUT else PrismType.BASE_OUT
+            )
+
+    def _register_quest_answer(self, prism, correct):
+        """
+        Update the posterior of the prism and move it to the most informative offset.
+        A cycle goes from the first correct answer to the first correct answer after a wrong one: its break is
+        the maximum offset reached while fused, its recovery the minimum offset reached while not fused.
+        """
+        staircase = self.staircases[prism.prism_type]
+        staircase.update(prism.offset, correct)
+        next_offset = staircase.next_offset()
+        if correct:
+            if not prism.direction:  # Fusion recovered: save the break-recovery cycle and start a new one
+                prism.add_break_recovery_pair(prism.current_max, prism.current_min)
+                prism.current_max = prism.offset
+            prism.direction = True
+            prism.offset = next_offset
+            prism.current_max = max(prism.current_max, prism.offset)
+        else:
+            if prism.direction:  # Fusion broken: the recovery is searched from here
+                prism.current_min = next_offset
+            prism.direction = False
+            prism.offset = next_offset
+            prism.current_min = min(prism.current_min, prism.offset)
+
+    def get_median_reaction_time_ms(self):
+        """
+        Return the median reaction time of the answers, or None if no reaction time is known.
+
+        :rtype: float | None
+        """
+        reaction_times = [answer.reaction_time_ms for answer in self.answers if answer.reaction_time_ms is not None]
+        return statistics.median(reaction_times) if reaction_times else None
+
+    def close_break_recovery_cycles(self):
+        """
+        Close the last break-recovery cycle if needed, at the end of the session.
+        """
+        for prism in self.prism_dict.values():
+            if prism.direction and (not prism.break_recovery_pairs or prism.break_recovery_pairs[-1][0] != prism.offset):
+                if prism.offset != 0:
+                    prism.add_break_recovery_pair(prism.offset, prism.current_min)
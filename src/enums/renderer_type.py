@@ -0,0 +1,6 @@
+from enum import Enum
+
+class RendererType(Enum):
+    FULL_FRAME = "full_frame"
+    DIRTY_RECT = "dirty_rect"
+    TEXTURE = "texture"
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class StaircaseType(Enum):
+    FIXED = "fixed"
+    QUEST = "quest"
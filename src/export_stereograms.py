@@ -0,0 +1,152 @@
+"""
+Batch export of random-dot stereograms (red, blue and anaglyph images), rendered with the same generator
+used by the game, across a process pool.
+
+Usage (from the src directory):
+    python -m export_stereograms --output stimuli --count 10000 --seed-start 0 --seed-end 100 --offset 0 40
+
+Stimulus i uses seed seed_start + i % (seed_end - seed_start) and trial index i // (seed_end - seed_start), so
+it can be reproduced from the manifest. Disparity and offset are drawn uniformly from their ranges.
+With a dot size larger than 1, the stimuli are generated on the grid of dots and upscaled: the square position
+and the disparity are drawn in dots, and written to the manifest in pixels.
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import csv
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import pygame
+from config.config import Config, DEFAULT_CONFIG_FILE_PATH
+from entities.layer import Layer
+from entities.noise_field import NoiseField
+from enums.layer_type import LayerType
+from renderers.anaglyph_compositor import AnaglyphCompositor
+from utils import calc_disparity
+
+MANIFEST_FILE_NAME = "manifest.csv"
+MANIFEST_COLUMNS = ["index", "seed", "trial_index", "square_rel_x", "square_rel_y", "disparity", "offset"]
+# Stimuli rendered by every task submitted to the process pool
+STIMULI_PER_TASK = 32
+# Tasks in flight per worker, to bound the memory used by pending tasks
+TASKS_PER_WORKER = 2
+
+
+def _init_worker():
+    # The anaglyph compositor converts the layers to the display format, which needs an (invisible) display
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+
+def render_stimuli(cfg, args, indices):
+    """
+    Render the stimuli of the given indices and save their images.
+
+    :return: the manifest rows of the stimuli
+    :rtype: list[list]
+    """
+    seeds_count = args.seed_end - args.seed_start
+    compositor = AnaglyphCompositor(pygame.display.get_surface(), max_entries=1)
+    # Sizes and disparities on the grid of dots, as in the game
+    dot_size = cfg.dot_size
+    grid_width, grid_height = cfg.layer_width // dot_size, cfg.layer_height // dot_size
+    square_size = max(1, round(cfg.square_size / dot_size))
+    disparity_range = (round(args.disparity[0] / dot_size), round(args.disparity[1] / dot_size))
+    rows = []
+    for index in indices:
+        seed = args.seed_start + index % seeds_count
+        trial_index = index // seeds_count
+        noise_field = NoiseField(grid_width, grid_height, cfg.noise_intensity, seed)
+        noise_matrix = noise_field.generate(trial_index)
+
+        rng = noise_field.trial_rng(trial_index)
+        square_rel_x = int(rng.integers(0, grid_width - square_size, endpoint=True))
+        square_rel_y = int(rng.integers(0, grid_height - square_size, endpoint=True))
+        disparity = int(rng.integers(disparity_range[0], disparity_range[1], endpoint=True))
+        offset = int(rng.integers(args.offset[0], args.offset[1], endpoint=True))
+
+        surfaces = {}
+        for layer_type in LayerType:
+            layer = Layer(cfg, layer_type, grid_width, grid_height, square_size, disparity)
+            surface = layer.render_surface(noise_matrix, square_rel_x, square_rel_y)
+            if dot_size > 1:
+                surface = pygame.transform.scale(surface, (grid_width * dot_size, grid_height * dot_size))
+            surfaces[layer_type.value.lower()] = surface
+        surfaces["anaglyph"], _ = compositor.get(surfaces["red"], surfaces["blue"], index, offset)
+
+        for name, surface in surfaces.items():
+            pygame.image.save(surface, os.path.join(args.output, f"{index:06d}_{name}.{args.format}"))
+        rows.append([index, seed, trial_index, square_rel_x * dot_size, square_rel_y * dot_size, disparity * dot_size, offset])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render random-dot stereograms to disk across a process pool.")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_FILE_PATH, help="configuration file")
+    parser.add_argument("--output", required=True, help="output directory")
+    parser.add_argument("--count", type=int, required=True, help="number of stimuli")
+    parser.add_argument("--seed-start", type=int, default=0, help="first seed (included)")
+    parser.add_argument("--seed-end", type=int, default=None, help="last seed (excluded, default: seed-start + count)")
+    parser.add_argument("--disparity", type=int, nargs=2, metavar=("MIN", "MAX"),
+                        help="disparity range in pixels (default: the configured disparity on the given screen)")
+    parser.add_argument("--offset", type=int, nargs=2, metavar=("MIN", "MAX"), default=(0, 0),
+                        help="prism offset range of the anaglyph (default: 0)")
+    parser.add_argument("--screen-size", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"), default=(1920, 1080),
+                        help="screen resolution used to compute the default disparity")
+    parser.add_argument("--format", default="png", choices=["png", "bmp", "tga", "jpg"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if args.seed_end is None:
+        args.seed_end = args.seed_start + args.count
+    if args.seed_end <= args.seed_start:
+        parser.error("--seed-end must be greater than --seed-start")
+    if args.disparity is not None:
+        if args.disparity[0] < 0:
+            parser.error("--disparity must not be negative")
+        if args.disparity[0] > args.disparity[1]:
+            parser.error("--disparity MIN must not be greater than MAX")
+    if args.offset[0] > args.offset[1]:
+        parser.error("--offset MIN must not be greater than MAX")
+    cfg = Config(args.config)
+    if args.disparity is None:
+        disparity = calc_disparity(cfg, *args.screen_size)
+        args.disparity = (disparity, disparity)
+    os.makedirs(args.output, exist_ok=True)
+
+    start = time.perf_counter()
+    done = 0
+    chunks = (range(i, min(i + STIMULI_PER_TASK, args.count)) for i in range(0, args.count, STIMULI_PER_TASK))
+    with open(os.path.join(args.output, MANIFEST_FILE_NAME), "w", newline="") as manifest_file, \
+            ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as executor:
+        manifest = csv.writer(manifest_file)
+        manifest.writerow(MANIFEST_COLUMNS)
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(render_stimuli, cfg, args, chunk))
+            if len(pending) < args.workers * TASKS_PER_WORKER:
+                continue
+            # Stream the results, keeping a bounded number of tasks in flight
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                rows = future.result()
+                manifest.writerows(rows)
+                done += len(rows)
+            elapsed = time.perf_counter() - start
+            print(f"\r{done}/{args.count} stimuli, {3 * done / elapsed:.1f} images/s", end="", file=sys.stderr)
+        for future in pending:
+            rows = future.result()
+            manifest.writerows(rows)
+            done += len(rows)
+
+    elapsed = time.perf_counter() - start
+    print(f"\r{done} stimuli ({3 * done} images) in {elapsed:.2f}s, {3 * done / elapsed:.1f} images/s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,20 @@
+import math
+import time
 import pygame
 from strings import Strings
 from abc import ABC, abstractmethod
+from entities.font_registry import FontRegistry
+from entities.frame_scheduler import FrameScheduler
+from entities.instrumentation import Instrumentation
+from entities.text_cache import TextCache
+from enums.renderer_type import RendererType
+from renderers.anaglyph_compositor import AnaglyphCompositor
+from renderers.dirty_rect_renderer import DirtyRectRenderer
+from renderers.full_frame_renderer import FullFrameRenderer
+from renderers.texture_renderer import TextureRenderer
+
+GAME_FONT_SIZE = 36
+GAME_FONT_SMALL_SIZE = 28
 
 
 class BaseGame(ABC):
@@ -12,7 +26,9 @@ class BaseGame(ABC):
     _TEXT_COLOR = (255, 255, 255)
     _TEXT_CORRECT_COLOR = (0, 255, 0)
     _TEXT_WRONG_COLOR = (255, 255, 0)
-    _GAME_FPS = 60
+    _TEXT_CACHE_SIZE = 64
+    _COMPOSITOR_CACHE_SIZE = 2
+    _PROFILER_KEY = pygame.K_F12
 
     def __init__(self, cfg, screen):
         if type(self) is BaseGame:
@@ -21,55 +37,101 @@ class BaseGame(ABC):
         self.screen = screen
         self.screen_width, self.screen_height = screen.get_size()
 
-        self.font = pygame.font.SysFont(None, 36)
-        self.font_small = pygame.font.SysFont(None, 28)
+        self.font = FontRegistry.get(None, GAME_FONT_SIZE)
+        self.font_small = FontRegistry.get(None, GAME_FONT_SMALL_SIZE)
+        self.text_cache = TextCache(self._TEXT_CACHE_SIZE)
 
-        self.clock = pygame.time.Clock()
+        self.scheduler = FrameScheduler(self.cfg.target_fps, self.cfg.idle_rendering)
         self.start_ticks = None
+        self.start_time = None
 
-        self.cursor_surface = pygame.Surface((self._CURSOR_RADIUS * 2, self._CURSOR_RADIUS * 2), pygame.SRCALPHA)
+        self.red_cursor_surface = self._create_cursor_surface(self._CURSOR_RED_COLOR)
+        self.blue_cursor_surface = self._create_cursor_surface(self._CURSOR_BLUE_COLOR)
         self.red_layer_surface = None
         self.blue_layer_surface = None
+        # Must be increased by subclasses every time the content of the layer surfaces changes
+        self.layers_version = 0
+
+        self.renderer = self._create_renderer()
+        self.compositor = AnaglyphCompositor(self.screen, self._COMPOSITOR_CACHE_SIZE, self.cfg.dot_size)
+        self.instrumentation = Instrumentation(self.cfg.instrumentation, self.cfg.instrumentation_dir)
 
         self.layer_x = None
         self.layer_y = None
-        self.offset = 0
+        self._reset_state()
+
+    def reset(self):
+        """
+        Reset the game state for a new session, keeping the allocated resources.
+        """
+        self.instrumentation.reset()
+        self._reset_state()
 
+    def _reset_state(self):
+        self.offset = 0
         self.time_left = self.cfg.game_duration_sec
         self.last_correct = None
+        self.stimulus_presented_time = None
+        self._presented_layers_version = None
+        self.renderer.invalidate()
+        self.scheduler.request_redraw()
+
+    def _create_renderer(self):
+        """
+        Create the renderer selected in the configuration.
+        """
+        renderer_type = RendererType(self.cfg.renderer)
+        if renderer_type == RendererType.DIRTY_RECT:
+            return DirtyRectRenderer(self.screen, self._BACKGROUND_COLOR)
+        if renderer_type == RendererType.TEXTURE:
+            return TextureRenderer(self.screen, self._BACKGROUND_COLOR)
+        return FullFrameRenderer(self.screen, self._BACKGROUND_COLOR)
+
+    def _create_cursor_surface(self, color):
+        """
+        Create a cursor surface of the given color.
+        """
+        surface = pygame.Surface((self._CURSOR_RADIUS * 2, self._CURSOR_RADIUS * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surface, color, (self._CURSOR_RADIUS, self._CURSOR_RADIUS), self._CURSOR_RADIUS)
+        return surface
 
     def _draw_layers(self):
         """
         Draw the red and blue layers on the screen. 
         """
-        # Red layer conventionally goes to the right (right eye), blue layer goes to the left
-        self.screen.blit(self.red_layer_surface, (self.layer_x + self.offset, self.layer_y), special_flags=pygame.BLEND_ADD)
-        self.screen.blit(self.blue_layer_surface, (self.layer_x - self.offset, self.layer_y), special_flags=pygame.BLEND_ADD)
+        if self.renderer.blends_layers:
+            # The layers are uploaded once per trial, the offset and the upscaling to the dot size are applied at draw time
+            width, height = self.red_layer_surface.get_size()
+            size = (width * self.cfg.dot_size, height * self.cfg.dot_size)
+            self.renderer.blit("red_layer", self.red_layer_surface, pygame.Rect((self.layer_x + self.offset, self.layer_y), size), pygame.BLEND_ADD, version=self.layers_version)
+            self.renderer.blit("blue_layer", self.blue_layer_surface, pygame.Rect((self.layer_x - self.offset, self.layer_y), size), pygame.BLEND_ADD, version=self.layers_version)
+            return
+        # The layers are composited once per trial and offset, on the black background the anaglyph is just copied
+        composite, composite_x = self.compositor.get(self.red_layer_surface, self.blue_layer_surface, self.layers_version, self.offset)
+        self.renderer.blit("layers", composite, (self.layer_x + composite_x, self.layer_y), version=(self.layers_version, self.offset))
 
     def _draw_cursors(self):
         """
         Draw the red and blue cursors.
         """
         mouse_x, mouse_y = pygame.mouse.get_pos()
-        pygame.draw.circle(self.cursor_surface, self._CURSOR_RED_COLOR, (self._CURSOR_RADIUS, self._CURSOR_RADIUS), self._CURSOR_RADIUS)
-        self.screen.blit(self.cursor_surface, (mouse_x + self.offset - self._CURSOR_RADIUS, mouse_y - self._CURSOR_RADIUS), special_flags=pygame.BLEND_ADD)
-        pygame.draw.circle(self.cursor_surface, self._CURSOR_BLUE_COLOR, (self._CURSOR_RADIUS, self._CURSOR_RADIUS), self._CURSOR_RADIUS)
-        self.screen.blit(self.cursor_surface, (mouse_x - self.offset - self._CURSOR_RADIUS, mouse_y - self._CURSOR_RADIUS), special_flags=pygame.BLEND_ADD)
+        self.renderer.blit("red_cursor", self.red_cursor_surface, (mouse_x + self.offset - self._CURSOR_RADIUS, mouse_y - self._CURSOR_RADIUS), pygame.BLEND_ADD)
+        self.renderer.blit("blue_cursor", self.blue_cursor_surface, (mouse_x - self.offset - self._CURSOR_RADIUS, mouse_y - self._CURSOR_RADIUS), pygame.BLEND_ADD)
 
     def _draw_score(self, score_text):
         """
         Draw the score text at the top left of the screen.
         """
-        score_text_surface = self.font.render(score_text, True, self._TEXT_COLOR)
-        self.screen.blit(score_text_surface, (20, 20))
+        score_text_surface = self.text_cache.render(self.font, score_text, self._TEXT_COLOR)
+        self.renderer.blit("score", score_text_surface, (20, 20), version=score_text)
 
     def _draw_timer(self):
         """
         Draw the timer text at the top right of the screen.
         """
         timer_text = Strings.MSG_TIME_LEFT.format(max(0, int(self.time_left)))
-        timer_surface = self.font.render(timer_text, True, self._TEXT_COLOR)
-        self.screen.blit(timer_surface, (self.screen_width - 190, 20))
+        timer_surface = self.text_cache.render(self.font, timer_text, self._TEXT_COLOR)
+        self.renderer.blit("timer", timer_surface, (self.screen_width - 190, 20), version=timer_text)
 
     def _draw_last_result(self):
         """
@@ -78,58 +140,92 @@ class BaseGame(ABC):
         if self.last_correct is not None:
             result_color = self._TEXT_CORRECT_COLOR if self.last_correct else self._TEXT_WRONG_COLOR
             result_msg = Strings.MSG_CORRECT if self.last_correct else Strings.MSG_WRONG
-            result_text_surface = self.font.render(result_msg, True, result_color)
-            self.screen.blit(result_text_surface, (20, 60))
+            result_text_surface = self.text_cache.render(self.font, result_msg, result_color)
+            self.renderer.blit("last_result", result_text_surface, (20, 60), version=result_msg)
 
     def _draw_quit_message(self):
         """
         Draw the quit message at the bottom center of the screen.
         """
-        quit_text_surface = self.font_small.render(Strings.MSG_QUIT, True, self._TEXT_COLOR)
+        quit_text_surface = self.text_cache.render(self.font_small, Strings.MSG_QUIT, self._TEXT_COLOR)
         quit_rect = quit_text_surface.get_rect(center=(self.screen_width // 2, self.screen_height - 40))
-        self.screen.blit(quit_text_surface, quit_rect)
+        self.renderer.blit("quit_message", quit_text_surface, quit_rect, version=Strings.MSG_QUIT)
 
     def _draw_additional_info(self, additional_info_text):
         """
         Draw an additional game info.
         """
-        surface = self.font.render(additional_info_text, True, self._TEXT_COLOR)
-        self.screen.blit(surface, (20, 100))
+        surface = self.text_cache.render(self.font, additional_info_text, self._TEXT_COLOR)
+        self.renderer.blit("additional_info", surface, (20, 100), version=additional_info_text)
     
     def _draw_scene(self, score_text, additional_info_text=""):
         """
         Draw the full game scene.
         """
-        self.screen.fill(self._BACKGROUND_COLOR)
-        self._draw_layers()
-        self._draw_cursors()
-        self._draw_score(score_text)
-        self._draw_timer()
-        self._draw_last_result()
-        self._draw_quit_message()
-        self._draw_additional_info(additional_info_text)
-        pygame.display.flip()    
+        measure = self.instrumentation.measure
+        self.renderer.begin_frame()
+        with measure("draw_layers"):
+            self._draw_layers()
+        with measure("draw_cursors"):
+            self._draw_cursors()
+        with measure("draw_hud"):
+            self._draw_score(score_text)
+            self._draw_timer()
+            self._draw_last_result()
+            self._draw_quit_message()
+            self._draw_additional_info(additional_info_text)
+        with measure("present"):
+            self.renderer.end_frame()
+        if self.layers_version != self._presented_layers_version:
+            # A new stimulus is on screen: the reaction time of the trial starts now
+            self.stimulus_presented_time = time.perf_counter()
+            self._presented_layers_version = self.layers_version
+        self.instrumentation.on_present()
 
     @abstractmethod
-    def _on_mouse_click(self):
+    def _on_mouse_click(self, event):
         """
         Handle mouse click event. 
         Must be implemented by subclasses.
+
+        :param event: the MOUSEBUTTONDOWN event, with the position and timestamp of the click
+        :type event: pygame.event.Event
         """
         pass
 
-    def _handle_input(self):
+    def _get_reaction_time_ms(self, timestamp):
+        """
+        Return the time from the presentation of the current stimulus to the given time, in milliseconds,
+        or None if the stimulus has not been presented yet.
+
+        :param timestamp: time.perf_counter time, e.g. the timestamp of a click event
+        :type timestamp: float
+        :rtype: float | None
         """
-        Handle the input events (quit, escape, mouse click).
+        if self.stimulus_presented_time is None or self._presented_layers_version != self.layers_version:
+            return None
+        return (timestamp - self.stimulus_presented_time) * 1000
+
+    def _handle_input(self, events):
+        """
+        Handle the input events (quit, escape, profiler toggle, mouse click), stamped by the input queue.
+        Any event may change the scene (e.g. the cursors), so it requests a redraw.
         """
-        for event in pygame.event.get():
+        for event in events:
+            self.scheduler.request_redraw()
+            if event.type == pygame.WINDOWEXPOSED:
+                self.renderer.invalidate()
             if event.type == pygame.QUIT:
                 return False
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     return False
+                if event.key == self._PROFILER_KEY:
+                    self.instrumentation.toggle_profiler()
             if event.type == pygame.MOUSEBUTTONDOWN:
-                self._on_mouse_click()
+                self.instrumentation.on_click(event.timestamp)
+                with self.instrumentation.measure("on_mouse_click"):
+                    self._on_mouse_click(event)
         return True
 
     def _update_timer(self):
@@ -140,9 +236,18 @@ class BaseGame(ABC):
         :rtype: bool
         """
         elapsed = (pygame.time.get_ticks() - self.start_ticks) / 1000
+        displayed_time_left = int(self.time_left)
         self.time_left = self.cfg.game_duration_sec - elapsed
+        if int(self.time_left) != displayed_time_left:
+            self.scheduler.request_redraw()
         return self.time_left > 0
 
+    def _get_time_to_timer_change(self):
+        """
+        Return the time until the displayed timer changes, in seconds.
+        """
+        return self.time_left - math.floor(self.time_left)
+
     def run(self, title):
         """
         Run the main game loop.
@@ -153,11 +258,19 @@ class BaseGame(ABC):
         pygame.display.set_caption(title)
         pygame.mouse.set_visible(False)
         running = True
+        self.renderer.invalidate()
         self.start_ticks = pygame.time.get_ticks()
+        self.start_time = time.perf_counter()
+        self.instrumentation.start()
+        self.scheduler.request_redraw()
         while running:
-            if not self._update_timer():
-                break
-            running = self._handle_input()
-            if running:
+            events = self.scheduler.wait_events(self._get_time_to_timer_change())
+            with self.instrumentation.measure("update_timer"):
+                if not self._update_timer():
+                    break
+            with self.instrumentation.measure("handle_input"):
+                running = self._handle_input(events)
+            if running and self.scheduler.should_render():
+                self.instrumentation.on_frame()
                 self._draw_scene()
-                self.clock.tick(self._GAME_FPS)
+                self.scheduler.on_frame_rendered()
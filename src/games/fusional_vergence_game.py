@@ -1,9 +1,17 @@
-import pygame
-import random
+import time
+import zlib
 from utils import calc_disparity
 from strings import Strings
-from entities.prism import Prism
+from entities.font_registry import FontRegistry
+from entities.instrumentation import Instrumentation
 from entities.layer import Layer
+from entities.noise_field import NoiseField
+from entities.noise_ring import NoiseRing
+from entities.results_store import SessionResult
+from entities.session_recorder import SessionRecorder
+from entities.stimulus_bank import StimulusBank
+from entities.stimulus_producer import StimulusProducer, Trial
+from entities.vergence_session import VergenceSession
 from enums.game_type import GameType
 from enums.layer_type import LayerType
 from enums.prism_type import PrismType
@@ -11,33 +19,97 @@ from games.base_game import BaseGame
 
 class FusionalVergenceGame(BaseGame):
 
-    def __init__(self, cfg, screen, game_type):
+    def __init__(self, cfg, screen, game_type, prepare_stimuli=True):
+        """
+        :param prepare_stimuli: generate the stimuli of the first session, otherwise prepare_stimuli must be called
+                                before the game is run
+        :type prepare_stimuli: bool
+        """
         super().__init__(cfg, screen)
+        # The stimuli are generated on the grid of dots, then upscaled to screen pixels by the compositor:
+        # the layer and square sizes and the disparity (computed in screen pixels) are converted to dots
+        self.dot_size = self.cfg.dot_size
+        self.grid_width = self.cfg.layer_width // self.dot_size
+        self.grid_height = self.cfg.layer_height // self.dot_size
+        self.square_size = max(1, round(self.cfg.square_size / self.dot_size))
+        self.disparity = round(calc_disparity(self.cfg, self.screen_width, self.screen_height) / self.dot_size)
+
+        self.layer_x = (self.screen_width - self.grid_width * self.dot_size) // 2
+        self.layer_y = (self.screen_height - self.grid_height * self.dot_size) // 2
+
+        self.red_layer = Layer(self.cfg, LayerType.RED, self.grid_width, self.grid_height, self.square_size, self.disparity, self.instrumentation)
+        self.blue_layer = Layer(self.cfg, LayerType.BLUE, self.grid_width, self.grid_height, self.square_size, self.disparity, self.instrumentation)
+        self.recorder = SessionRecorder(self.cfg.record_sessions, self.cfg.recordings_dir)
+        self.stimulus_bank = StimulusBank(self.cfg.stimulus_bank_dir, self.cfg.stimulus_bank_max_mb, self.cfg.stimulus_bank_min_seeds)
+        if prepare_stimuli:
+            self.prepare_stimuli()
+        self.set_game_type(game_type)
+
+    def reset(self, game_type):
+        """
+        Prepare a new session with new stimuli, reusing the layers and their surfaces.
+        """
+        self.prepare_stimuli()
+        self.reset_session(game_type)
+
+    def prepare_stimuli(self):
+        """
+        Generate the stimuli of a new session (seed, noise, layer surfaces and prefetching of the next trials)
+        and discard the collected instrumentation.
+        Uses only NumPy and software surfaces, neither the display nor the fonts, so it can run on a worker thread
+        while the game is not running.
+        """
+        self.instrumentation.reset()
+        frame_count = self.cfg.dynamic_noise_frames if self.cfg.dynamic_noise else 0
+        seed = self.cfg.noise_seed
+        if seed is None:
+            # Without a fixed seed, the banked seeds are used only if there are enough of them to rotate through
+            seed = self.stimulus_bank.choose_seed(self.grid_width, self.grid_height, self.cfg.noise_intensity, frame_count)
+        self.noise_field = NoiseField(self.grid_width, self.grid_height, self.cfg.noise_intensity, seed)
+        self.trial_index = 0
+        self.started_at = None
+        self.duration_sec = None
+        self.layers_version += 1
+        # The banked noise is mapped read-only, without copies: the layers only read it
+        self.noise_matrix = self.stimulus_bank.get_noise(self.noise_field)
+        if self.noise_matrix is None:
+            self.noise_matrix = self.noise_field.generate(self.trial_index)
+        self.square_rel_x, self.square_rel_y = self._get_square_position(self.trial_index)
+        self.red_layer_surface = self.red_layer.redraw_surface(self.noise_matrix, self.square_rel_x, self.square_rel_y)
+        self.blue_layer_surface = self.blue_layer.redraw_surface(self.noise_matrix, self.square_rel_x, self.square_rel_y)
+
+        # With dynamic noise the layers are synthesized at every frame, so there is nothing to prefetch per trial
+        self.noise_ring = None
+        self._noise_ring_checksum = None
+        self.dynamic_frame_index = 0
+        if self.cfg.dynamic_noise:
+            self.noise_ring = NoiseRing(self.noise_field, frame_count, self.stimulus_bank.get_frames(self.noise_field, frame_count))
+        self.scheduler.animating = self.noise_ring is not None
+
+        # With the same noise for every trial, the click handler only moves the square regions of the layers
+        # (see Layer.update_surface), faster than adopting surfaces rendered in full in background
+        self.stimulus_producer = None
+        if self.cfg.prefetch_trials > 0 and self.cfg.refresh_noise_per_trial and self.noise_ring is None:
+            self.stimulus_producer = StimulusProducer(self._create_trial, self.trial_index + 1, self.cfg.prefetch_trials)
+
+    def reset_session(self, game_type):
+        """
+        Reset the game state for a new session of the given game type, keeping the prepared stimuli.
+        Must run on the main thread, as it invalidates the renderer.
+        """
+        self._reset_state()
+        self.set_game_type(game_type)
+
+    def set_game_type(self, game_type):
+        """
+        Start a new vergence session of the given game type.
+        """
         self.game_type = game_type
-        self.disparity = calc_disparity(self.cfg, self.screen_width, self.screen_height)
-
-        self.layer_x = (self.screen_width - self.cfg.layer_width) // 2
-        self.layer_y = (self.screen_height - self.cfg.layer_height) // 2
-        self.square_rel_x = random.randint(0, self.cfg.layer_width - self.cfg.square_size)
-        self.square_rel_y = random.randint(0, self.cfg.layer_height - self.cfg.square_size)
-
-        self.noise_matrix = self._create_noise_matrix()
-        self.red_layer = Layer(self.cfg, LayerType.RED, self.cfg.layer_width, self.cfg.layer_height, self.cfg.square_size, self.disparity)
-        self.blue_layer = Layer(self.cfg, LayerType.BLUE, self.cfg.layer_width, self.cfg.layer_height, self.cfg.square_size, self.disparity)
-        self.red_layer_surface = self.red_layer.create_surface(self.noise_matrix, self.square_rel_x, self.square_rel_y)
-        self.blue_layer_surface = self.blue_layer.create_surface(self.noise_matrix, self.square_rel_x, self.square_rel_y)
-        
-        self.prism_dict = {
-            PrismType.BASE_IN: Prism(PrismType.BASE_IN, self.cfg.initial_offset),
-            PrismType.BASE_OUT: Prism(PrismType.BASE_OUT, self.cfg.initial_offset)
-        }
-
-        if self.game_type == GameType.BASE_IN:
-            self.current_prism_type = PrismType.BASE_IN
-        elif self.game_type == GameType.BASE_OUT:
-            self.current_prism_type = PrismType.BASE_OUT
-        else:
-            self.current_prism_type = PrismType.BASE_IN
+        self.session = VergenceSession(self.cfg, self.game_type)
+        self.prism_dict = self.session.prism_dict
+
+        self._break_recovery_cycles_msg = ""
+        self._break_recovery_cycles_msg_key = None
 
     def _get_score_msg(self):
         if self.game_type == GameType.BASE_OUT:
@@ -50,78 +122,167 @@ class FusionalVergenceGame(BaseGame):
             return ""
 
     def _get_break_recovery_cycles_msg(self):
-        parts = []
-        for _, prism in self.prism_dict.items():
-            if prism.break_recovery_pairs:
-                osc_str = ", ".join(f"{min_val}-{max_val}" for min_val, max_val in prism.break_recovery_pairs)
-                parts.append(f"{prism.prism_type.value.split('_')[1]} {osc_str}")
-        if not parts:
-            return ""
-        return f"B-R cycles: {' | '.join(parts)}"
-        
-    def _create_noise_matrix(self):
-        return [[random.randint(0, self.cfg.noise_intensity) for _ in range(self.cfg.layer_width)] for _ in range(self.cfg.layer_height)]
+        # The message is rebuilt only when a break-recovery pair is added
+        msg_key = tuple(len(prism.break_recovery_pairs) for prism in self.prism_dict.values())
+        if msg_key != self._break_recovery_cycles_msg_key:
+            self._break_recovery_cycles_msg_key = msg_key
+            parts = []
+            for _, prism in self.prism_dict.items():
+                if prism.break_recovery_pairs:
+                    parts.append(f"{prism.prism_type.value.split('_')[1]} {prism.break_recovery_text}")
+            self._break_recovery_cycles_msg = f"B-R cycles: {' | '.join(parts)}" if parts else ""
+        return self._break_recovery_cycles_msg
 
-    def _on_mouse_click(self):
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        mouse_rel_x = mouse_x - self.layer_x
-        mouse_rel_y = mouse_y - self.layer_y
+    def _get_reaction_time_msg(self):
+        median_reaction_time_ms = self.session.get_median_reaction_time_ms()
+        return Strings.MSG_REACTION_TIME.format(median_reaction_time_ms) if median_reaction_time_ms is not None else ""
+
+    def _on_mouse_click(self, event):
+        # The position of the click, not the current one, which may have changed since then
+        mouse_x, mouse_y = event.pos
+        # Position relative to the layers, in dots
+        mouse_rel_x = (mouse_x - self.layer_x) / self.dot_size
+        mouse_rel_y = (mouse_y - self.layer_y) / self.dot_size
 
         # Check if the click is inside the square
         click_is_on_square = (
-            0 <= mouse_rel_x <= self.cfg.layer_width and
-            0 <= mouse_rel_y <= self.cfg.layer_height and
-            self.square_rel_x <= mouse_rel_x <= self.square_rel_x + self.cfg.square_size and
-            self.square_rel_y <= mouse_rel_y <= self.square_rel_y + self.cfg.square_size
+            0 <= mouse_rel_x <= self.grid_width and
+            0 <= mouse_rel_y <= self.grid_height and
+            self.square_rel_x <= mouse_rel_x <= self.square_rel_x + self.square_size and
+            self.square_rel_y <= mouse_rel_y <= self.square_rel_y + self.square_size
         )
 
-        prism = self.prism_dict[self.current_prism_type]
-        if click_is_on_square:
-            self.last_correct = True
-            if not prism.direction:  # Was decreasing, now increasing: save the break-recovery cycle and reset min/max
-                prism.break_recovery_pairs.append((prism.current_max, prism.current_min))
-                prism.current_min = prism.offset
-                prism.current_max = prism.offset
-            prism.direction = True
-            # Increase offset and update max
-            if prism.offset < self.cfg.max_offset:
-                prism.offset += self.cfg.step
-                prism.current_max = prism.offset
-        else:
-            self.last_correct = False
-            prism.direction = False
-            # Decrease offset and update min
-            if prism.offset > self.cfg.min_offset:
-                prism.offset -= self.cfg.step
-                prism.current_min = prism.offset
-
-        # Alternate current_prism for JUMP_DUCTION
-        if self.game_type == GameType.JUMP_DUCTION:
-            self.current_prism_type = (
-                PrismType.BASE_IN if self.current_prism_type == PrismType.BASE_OUT else PrismType.BASE_OUT
+        prism = self.session.get_current_prism()
+        offset = prism.offset
+        reaction_time_ms = self._get_reaction_time_ms(event.timestamp)
+        self.last_correct = click_is_on_square
+        self.session.register_answer(click_is_on_square, reaction_time_ms)
+        if self.recorder.enabled:
+            self.recorder.record_click(
+                (event.timestamp - self.start_time) * 1000, event.pos, self.trial_index, self.get_stimulus_checksum(),
+                click_is_on_square, reaction_time_ms, prism.prism_type, offset, prism.offset, prism.direction
             )
 
-        self.square_rel_x = random.randint(0, self.cfg.layer_width - self.cfg.square_size)
-        self.square_rel_y = random.randint(0, self.cfg.layer_height - self.cfg.square_size)
+        self._next_trial()
 
-        self.red_layer_surface = self.red_layer.create_surface(self.noise_matrix, self.square_rel_x, self.square_rel_y)
-        self.blue_layer_surface = self.blue_layer.create_surface(self.noise_matrix, self.square_rel_x, self.square_rel_y)
+    def get_stimulus_checksum(self):
+        """
+        Return the CRC-32 of the stimulus of the current trial, independent from the screen pixel format.
+        With dynamic noise, it covers the noise frames and the square position.
+        """
+        if self.noise_ring is None:
+            return self.blue_layer.get_checksum(self.red_layer.get_checksum())
+        if self._noise_ring_checksum is None:
+            self._noise_ring_checksum = zlib.crc32(self.noise_ring.frames)
+        return zlib.crc32(f"{self.square_rel_x},{self.square_rel_y}".encode(), self._noise_ring_checksum)
 
-    def _draw_scene(self):
-        if self.current_prism_type == PrismType.BASE_IN:
-            self.offset = -self.prism_dict[PrismType.BASE_IN].offset
+    def _get_square_position(self, trial_index):
+        rng = self.noise_field.trial_rng(trial_index)
+        square_rel_x = int(rng.integers(0, self.grid_width - self.square_size, endpoint=True))
+        square_rel_y = int(rng.integers(0, self.grid_height - self.square_size, endpoint=True))
+        return square_rel_x, square_rel_y
+
+    def _get_trial_noise(self, trial_index):
+        """
+        Return the noise of a trial: fresh noise per trial if configured, otherwise the noise of the first trial.
+        """
+        if self.cfg.refresh_noise_per_trial:
+            return self.noise_field.generate(trial_index)
+        return self.noise_matrix
+
+    def _create_trial(self, trial_index):
+        """
+        Create a trial from scratch, without changing the game state (called by the stimulus producer).
+        """
+        square_rel_x, square_rel_y = self._get_square_position(trial_index)
+        noise_matrix = self._get_trial_noise(trial_index)
+        return Trial(
+            trial_index,
+            square_rel_x,
+            square_rel_y,
+            noise_matrix,
+            self.red_layer.render_surface(noise_matrix, square_rel_x, square_rel_y),
+            self.blue_layer.render_surface(noise_matrix, square_rel_x, square_rel_y)
+        )
+
+    def _next_trial(self):
+        """
+        Move to the next trial, using a pre-generated one if ready, without waiting for it.
+        """
+        self.trial_index += 1
+        self.layers_version += 1
+        if self.noise_ring is not None:
+            # The layers are synthesized at every frame from the square position
+            self.square_rel_x, self.square_rel_y = self._get_square_position(self.trial_index)
+            return
+
+        trial = self.stimulus_producer.pop(self.trial_index) if self.stimulus_producer else None
+        if trial is not None:
+            self.noise_matrix = trial.noise_matrix
+            self.square_rel_x, self.square_rel_y = trial.square_rel_x, trial.square_rel_y
+            self.red_layer_surface = self.red_layer.set_surface(trial.red_layer_surface, self.square_rel_x, self.square_rel_y)
+            self.blue_layer_surface = self.blue_layer.set_surface(trial.blue_layer_surface, self.square_rel_x, self.square_rel_y)
+            return
+
+        self.square_rel_x, self.square_rel_y = self._get_square_position(self.trial_index)
+        if self.cfg.refresh_noise_per_trial:
+            self.noise_matrix = self._get_trial_noise(self.trial_index)
+            self.red_layer_surface = self.red_layer.redraw_surface(self.noise_matrix, self.square_rel_x, self.square_rel_y)
+            self.blue_layer_surface = self.blue_layer.redraw_surface(self.noise_matrix, self.square_rel_x, self.square_rel_y)
         else:
-            self.offset = self.prism_dict[PrismType.BASE_OUT].offset
+            # The noise never changes between trials: only the square regions of the existing surfaces are updated
+            self.red_layer_surface = self.red_layer.update_surface(self.noise_matrix, self.square_rel_x, self.square_rel_y)
+            self.blue_layer_surface = self.blue_layer.update_surface(self.noise_matrix, self.square_rel_x, self.square_rel_y)
+
+    def _draw_layers(self):
+        if self.noise_ring is None:
+            super()._draw_layers()
+            return
+
+        # Dynamic noise: the square keeps its position and disparity while the noise changes at every frame
+        with self.instrumentation.measure(Instrumentation.DYNAMIC_FRAME_GENERATION):
+            noise_frame = self.noise_ring.next()
+            composite, composite_x = self.compositor.compose(
+                self.red_layer.create_pixels(noise_frame, self.square_rel_x, self.square_rel_y),
+                self.blue_layer.create_pixels(noise_frame, self.square_rel_x, self.square_rel_y),
+                self.offset
+            )
+        self.dynamic_frame_index += 1
+        self.renderer.blit("layers", composite, (self.layer_x + composite_x, self.layer_y), version=(self.layers_version, self.offset, self.dynamic_frame_index))
+
+    def _draw_scene(self):
+        self.offset = self.session.get_signed_offset()
 
         super()._draw_scene(
             score_text=self._get_score_msg(),
             additional_info_text=self._get_break_recovery_cycles_msg()
         )
 
+    def get_session_result(self):
+        """
+        Return the result of the last session, to be stored.
+
+        :rtype: SessionResult
+        """
+        return SessionResult.from_session(
+            self.cfg.patient_id, self.started_at, self.game_type, self.noise_field.seed, self.duration_sec, self.session
+        )
+
     def run(self):
-        super().run(title=Strings.FUSIONAL_VERGENCE_TITLE)
-        # Close the last break-recovery cycle if needed
-        for prism in self.prism_dict.values():
-            if prism.direction and (not prism.break_recovery_pairs or prism.break_recovery_pairs[-1][0] != prism.offset):
-                if prism.offset != 0:
-                    prism.break_recovery_pairs.append((prism.offset, prism.current_min))
+        self.started_at = time.time()
+        self.recorder.start(self.cfg, (self.screen_width, self.screen_height), self.game_type, self.noise_field.seed)
+        if self.stimulus_producer:
+            self.stimulus_producer.start()
+        try:
+            super().run(title=Strings.FUSIONAL_VERGENCE_TITLE)
+        finally:
+            if self.stimulus_producer:
+                self.stimulus_producer.stop()
+                self.instrumentation.set_counter("prefetch_hits", self.stimulus_producer.hit_count)
+                self.instrumentation.set_counter("prefetch_misses", self.stimulus_producer.miss_count)
+        self.session.close_break_recovery_cycles()
+        self.duration_sec = time.perf_counter() - self.start_time
+        self.recorder.record_end(self.duration_sec * 1000, self.session)
+        self.recorder.export()
+        self.instrumentation.set_counter("font_load_ms", FontRegistry.get_load_times())
+        self.instrumentation.export()
@@ -0,0 +1,111 @@
+import numpy as np
+import pygame
+from collections import OrderedDict
+from entities.layer import channel_view
+from enums.layer_type import LayerType
+
+
+class AnaglyphCompositor:
+    """
+    Cache of the red and blue layers pre-composited into a single anaglyph surface in the screen pixel format,
+    keyed by (layers version, offset). A steady frame then needs one plain blit instead of two additive blends.
+
+    The layers may be generated on a grid of dots larger than a pixel: they are then upscaled to screen pixels
+    (nearest neighbour) once per trial, while the offsets stay in screen pixels.
+    """
+
+    def __init__(self, screen, max_entries, dot_size=1):
+        """
+        :param screen: surface the composites are drawn on, whose pixel format they use
+        :param max_entries: number of offsets cached for the same layers (e.g. 2 for jump ductions)
+        :type max_entries: int
+        :param dot_size: size of a dot of the layers, in screen pixels
+        :type dot_size: int
+        """
+        self.screen = screen
+        self.max_entries = max_entries
+        self.dot_size = dot_size
+        self._layers_version = None
+        self._converted_layers = None
+        self._composites = OrderedDict()
+        self._frame_composite = None
+        self._frame_offset = None
+
+    def get(self, red_layer_surface, blue_layer_surface, layers_version, offset):
+        """
+        Return the anaglyph of the layers, with the red layer shifted by +offset and the blue one by -offset.
+
+        :return: the composite surface and its horizontal position relative to the unshifted layers
+        :rtype: tuple[pygame.Surface, int]
+        """
+        if layers_version != self._layers_version:
+            # New trial: the cached composites refer to the previous layers
+            self.invalidate()
+            self._layers_version = layers_version
+            self._converted_layers = (self._convert(red_layer_surface), self._convert(blue_layer_surface))
+
+        composite = self._composites.get(offset)
+        if composite is not None:
+            self._composites.move_to_end(offset)
+        else:
+            composite = self._composite(*self._converted_layers, offset)
+            self._composites[offset] = composite
+            if len(self._composites) > self.max_entries:
+                self._composites.popitem(last=False)
+        return composite, -abs(offset)
+
+    def compose(self, red_pixels, blue_pixels, offset):
+        """
+        Write the layer intensities directly into a reused anaglyph surface, for layers that change at every frame
+        (e.g. dynamic noise) and would make every cached composite useless.
+
+        :param red_pixels: (height, width) uint8 intensities of the red layer, one per dot
+        :param blue_pixels: (height, width) uint8 intensities of the blue layer, one per dot
+        :return: the composite surface and its horizontal position relative to the unshifted layers
+        :rtype: tuple[pygame.Surface, int]
+        """
+        margin = abs(offset)
+        height, width = red_pixels.shape[0] * self.dot_size, red_pixels.shape[1] * self.dot_size
+        if offset != self._frame_offset or self._frame_composite.get_size() != (width + 2 * margin, height):
+            # The columns outside the shifted layers stay black as long as the offset does not change
+            self._frame_composite = pygame.Surface((width + 2 * margin, height), 0, self.screen)
+            self._frame_composite.fill((0, 0, 0))
+            self._frame_offset = offset
+
+        # The layers use disjoint color channels, so their additive blend is a plain write of each channel.
+        # Surface arrays are indexed (x, y), while the intensities are indexed [y][x]
+        with channel_view(self._frame_composite, LayerType.RED) as red_channel:
+            self._write_dots(red_channel[margin + offset:margin + offset + width], red_pixels)
+        with channel_view(self._frame_composite, LayerType.BLUE) as blue_channel:
+            self._write_dots(blue_channel[margin - offset:margin - offset + width], blue_pixels)
+        return self._frame_composite, -margin
+
+    def _write_dots(self, channel, pixels):
+        """
+        Write (height, width) dot intensities into an (x, y) channel view of their size in pixels: every dot is
+        broadcast over its (dot size, dot size) block of the view, without intermediate copies.
+        """
+        height, width = pixels.shape
+        channel.reshape(width, self.dot_size, height, self.dot_size)[:] = pixels.T[:, np.newaxis, :, np.newaxis]
+
+    def invalidate(self):
+        self._layers_version = None
+        self._converted_layers = None
+        self._composites.clear()
+
+    def _convert(self, layer_surface):
+        surface = layer_surface.convert(self.screen)
+        if self.dot_size > 1:
+            width, height = surface.get_size()
+            surface = pygame.transform.scale(surface, (width * self.dot_size, height * self.dot_size))
+        return surface
+
+    def _composite(self, red_layer_surface, blue_layer_surface, offset):
+        margin = abs(offset)
+        width, height = red_layer_surface.get_size()
+        composite = pygame.Surface((width + 2 * margin, height), 0, self.screen)
+        composite.fill((0, 0, 0))
+        # Red layer conventionally goes to the right (right eye), blue layer goes to the left
+        composite.blit(red_layer_surface, (margin + offset, 0), special_flags=pygame.BLEND_ADD)
+        composite.blit(blue_layer_surface, (margin - offset, 0), special_flags=pygame.BLEND_ADD)
+        return composite
@@ -0,0 +1,55 @@
+import pygame
+from abc import ABC, abstractmethod
+
+
+class BaseRenderer(ABC):
+    """
+    Composes a frame from a sequence of blits and presents it on the display.
+    """
+    # True if the renderer blends the BLEND_ADD blits at draw time at no extra cost (e.g. textures): the anaglyph
+    # layers are then blitted separately, shifted by the offset, instead of being pre-composited by the game
+    blends_layers = False
+
+    def __init__(self, screen, background_color):
+        self.screen = screen
+        self.background_color = background_color
+
+    @abstractmethod
+    def begin_frame(self):
+        """
+        Start a new frame.
+        """
+        pass
+
+    @abstractmethod
+    def blit(self, key, surface, dest, special_flags=0, version=None):
+        """
+        Add a blit to the current frame.
+
+        :param key: unique name of the scene element within the frame
+        :type key: str
+        :param surface: surface to draw
+        :param dest: top left position or rect of the surface on the screen
+        :param special_flags: pygame blend flags
+        :param version: hashable describing the surface content, if the surface object is reused (or re-rendered)
+                        for the same content. When None, the surface identity is used.
+        """
+        pass
+
+    @abstractmethod
+    def end_frame(self):
+        """
+        Present the frame on the display.
+        """
+        pass
+
+    def invalidate(self):
+        """
+        Force a full redraw at the next frame.
+        """
+        pass
+
+    @staticmethod
+    def _get_rect(surface, dest):
+        x, y = dest.topleft if isinstance(dest, pygame.Rect) else dest
+        return pygame.Rect(x, y, surface.get_width(), surface.get_height())
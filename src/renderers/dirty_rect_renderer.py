@@ -0,0 +1,93 @@
+import pygame
+from renderers.base_renderer import BaseRenderer
+
+
+class _Entry:
+    def __init__(self, surface, rect, special_flags, version):
+        self.surface = surface
+        self.rect = rect
+        self.special_flags = special_flags
+        self.signature = (
+            version if version is not None else id(surface),
+            tuple(rect),
+            special_flags
+        )
+
+
+class DirtyRectRenderer(BaseRenderer):
+    """
+    Redraws and pushes to the display only the regions of the screen that changed since the previous frame.
+
+    A scene element is dirty when its surface (or version), position or blend flags change: both its old and new
+    regions are cleared and every element overlapping them is blitted again, clipped to the region.
+    """
+    # Above this fraction of dirty screen area a full redraw is cheaper
+    _FULL_REDRAW_AREA_RATIO = 0.5
+
+    def __init__(self, screen, background_color):
+        super().__init__(screen, background_color)
+        self._entries = {}
+        self._previous_entries = {}
+        self._full_redraw = True
+
+    def begin_frame(self):
+        self._entries = {}
+
+    def blit(self, key, surface, dest, special_flags=0, version=None):
+        self._entries[key] = _Entry(surface, self._get_rect(surface, dest), special_flags, version)
+
+    def end_frame(self):
+        screen_rect = self.screen.get_rect()
+        dirty_rects = [] if self._full_redraw else self._merge_rects(self._get_dirty_rects(), screen_rect)
+        dirty_area = sum(rect.width * rect.height for rect in dirty_rects)
+
+        if self._full_redraw or dirty_area > self._FULL_REDRAW_AREA_RATIO * screen_rect.width * screen_rect.height:
+            self.screen.fill(self.background_color)
+            for entry in self._entries.values():
+                self.screen.blit(entry.surface, entry.rect, special_flags=entry.special_flags)
+            pygame.display.flip()
+            self._full_redraw = False
+        elif dirty_rects:
+            for dirty_rect in dirty_rects:
+                self.screen.set_clip(dirty_rect)
+                self.screen.fill(self.background_color)
+                for entry in self._entries.values():
+                    if entry.rect.colliderect(dirty_rect):
+                        self.screen.blit(entry.surface, entry.rect, special_flags=entry.special_flags)
+            self.screen.set_clip(None)
+            pygame.display.update(dirty_rects)
+
+        self._previous_entries = self._entries
+
+    def invalidate(self):
+        self._full_redraw = True
+
+    def _get_dirty_rects(self):
+        dirty_rects = []
+        for key in self._entries.keys() | self._previous_entries.keys():
+            entry = self._entries.get(key)
+            previous_entry = self._previous_entries.get(key)
+            if entry is not None and previous_entry is not None and entry.signature == previous_entry.signature:
+                continue
+            if entry is not None:
+                dirty_rects.append(entry.rect)
+            if previous_entry is not None:
+                dirty_rects.append(previous_entry.rect)
+        return dirty_rects
+
+    @staticmethod
+    def _merge_rects(rects, screen_rect):
+        """
+        Clip the rects to the screen and merge the overlapping ones, so that no region is redrawn twice.
+        """
+        merged = []
+        for rect in rects:
+            rect = rect.clip(screen_rect)
+            if rect.width == 0 or rect.height == 0:
+                continue
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
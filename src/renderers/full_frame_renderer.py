@@ -0,0 +1,17 @@
+import pygame
+from renderers.base_renderer import BaseRenderer
+
+
+class FullFrameRenderer(BaseRenderer):
+    """
+    Clears and redraws the whole screen at every frame.
+    """
+
+    def begin_frame(self):
+        self.screen.fill(self.background_color)
+
+    def blit(self, key, surface, dest, special_flags=0, version=None):
+        self.screen.blit(surface, dest, special_flags=special_flags)
+
+    def end_frame(self):
+        pygame.display.flip()
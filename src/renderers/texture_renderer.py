@@ -0,0 +1,78 @@
+import pygame
+from pygame._sdl2.video import Renderer, Texture, Window
+from renderers.base_renderer import BaseRenderer
+
+
+class _Entry:
+    def __init__(self, texture, texture_format):
+        self.texture = texture
+        # Size, blending and per-pixel alpha of the texture, which can be updated only by surfaces of the same format
+        self.texture_format = texture_format
+        self.signature = None
+
+
+class TextureRenderer(BaseRenderer):
+    """
+    Draws the frames with the SDL renderer of the window (pygame._sdl2.video) instead of blitting surfaces.
+
+    A surface is uploaded to a texture only when it changes (new surface or version), then drawn at every frame:
+    BLEND_ADD blits are blended additively at draw time, so the anaglyph layers are drawn as two textures shifted
+    by the prism offset instead of being pre-composited. A Rect destination larger than the surface stretches it
+    (nearest neighbour), e.g. to upscale layers generated on a grid of dots.
+
+    The window must have an SDL renderer: the display mode is set with pygame.SCALED (see set_display_mode), which
+    presents aligned to vsync when requested and available. SDL's software renderer (SDL_RENDER_DRIVER=software)
+    works as well, e.g. without a GPU.
+    """
+    blends_layers = True
+
+    def __init__(self, screen, background_color):
+        super().__init__(screen, background_color)
+        self.sdl_renderer = Renderer.from_window(Window.from_display_module())
+        self._entries = {}
+        self._draws = []
+
+    def begin_frame(self):
+        self._draws = []
+
+    def blit(self, key, surface, dest, special_flags=0, version=None):
+        if not surface.get_width() or not surface.get_height():
+            # Nothing to draw (e.g. an empty text), and SDL cannot create empty textures
+            return
+        signature = (version if version is not None else id(surface), special_flags)
+        entry = self._entries.get(key)
+        if entry is None or entry.signature != signature:
+            entry = self._upload(key, entry, surface, special_flags)
+            entry.signature = signature
+        rect = dest if isinstance(dest, pygame.Rect) else self._get_rect(surface, dest)
+        self._draws.append((entry.texture, rect))
+
+    def end_frame(self):
+        self.sdl_renderer.draw_color = pygame.Color(self.background_color)
+        self.sdl_renderer.clear()
+        for texture, rect in self._draws:
+            texture.draw(dstrect=rect)
+        self.sdl_renderer.present()
+
+    def _upload(self, key, entry, surface, special_flags):
+        """
+        Upload the surface to the texture of the key, reusing the texture if it has the same size and blending.
+        """
+        if special_flags == pygame.BLEND_ADD and (surface.get_flags() & pygame.SRCALPHA or surface.get_colorkey()):
+            # pygame adds the colors ignoring the alpha, while SDL weights them by it: the surface is flattened
+            # on black, where the transparent pixels add nothing
+            flattened = pygame.Surface(surface.get_size())
+            flattened.blit(surface, (0, 0), special_flags=pygame.BLEND_ADD)
+            surface = flattened
+
+        texture_format = (surface.get_size(), special_flags, bool(surface.get_flags() & pygame.SRCALPHA))
+        if entry is not None and entry.texture_format == texture_format:
+            entry.texture.update(surface)
+            return entry
+
+        texture = Texture.from_surface(self.sdl_renderer, surface)
+        if special_flags == pygame.BLEND_ADD:
+            texture.blend_mode = pygame.BLENDMODE_ADD
+        entry = _Entry(texture, texture_format)
+        self._entries[key] = entry
+        return entry
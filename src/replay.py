@@ -0,0 +1,68 @@
+"""
+Headless replay of a session recorded with record_sessions, verifying that the game reproduces it.
+
+Usage (from the src directory):
+    python -m replay recordings/recording_20250101_120000.jsonl.gz
+    python -m replay recordings/recording_20250101_120000.jsonl.gz --speed 1 --render --instrumentation
+
+The recorded clicks are fed to FusionalVergenceGame at maximum speed (or paced on their timestamps), and every
+difference in stimuli, answers, prism transitions and results is reported. The exit code is 1 on differences.
+"""
+import os
+
+# Must be set before pygame is imported, to run without a display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import sys
+import pygame
+from entities.session_replayer import SessionReplayer
+from utils import set_display_mode
+
+# Differences printed, the first one is usually the cause of the others
+MAX_PRINTED_MISMATCHES = 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded session and verify it.")
+    parser.add_argument("recording", help="recording file (.jsonl.gz)")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="playback speed w.r.t. the recorded timestamps, e.g. 1 for real speed (default: maximum speed)")
+    parser.add_argument("--render", action="store_true", help="render the frames")
+    parser.add_argument("--instrumentation", action="store_true", help="export the performance instrumentation of the replay")
+    parser.add_argument("--output", help="write the replay summary to this JSON file")
+    args = parser.parse_args()
+
+    replayer = SessionReplayer(args.recording)
+    replayer.cfg.instrumentation = args.instrumentation
+
+    pygame.init()
+    screen = set_display_mode(replayer.cfg, replayer.screen_size)
+    result = replayer.replay(screen, args.speed, args.render)
+    pygame.quit()
+
+    summary = {
+        "recording": args.recording,
+        "seed": replayer.header["seed"],
+        "game_type": replayer.game_type.value,
+        "clicks": result.clicks,
+        "frames": result.frames,
+        "elapsed_sec": result.elapsed_sec,
+        "ok": result.ok,
+        "mismatches": result.mismatches
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(summary, file, indent=2)
+
+    for mismatch in result.mismatches[:MAX_PRINTED_MISMATCHES]:
+        print(mismatch, file=sys.stderr)
+    print(f"{result.clicks} clicks replayed in {result.elapsed_sec:.3f}s, "
+          f"{len(result.mismatches)} differences", file=sys.stderr)
+    sys.exit(0 if result.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
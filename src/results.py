@@ -0,0 +1,85 @@
+"""
+Query the stored session results.
+
+Usage (from the src directory):
+    python -m results patients
+    python -m results sessions --patient P001 --limit 10
+    python -m results trends --patient P001 --prism BASE_IN --since 2025-01-01
+
+The results are printed as a table, or as JSON with --json.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from config.config import Config, DEFAULT_CONFIG_FILE_PATH
+from entities.results_store import ResultsStore
+from enums.prism_type import PrismType
+
+
+def _format_row(row):
+    """
+    Format the values of a result row to be printed in a table.
+    """
+    row = dict(row)
+    for column in ("started_at", "last_started_at"):
+        if row.get(column) is not None:
+            row[column] = datetime.fromtimestamp(row[column]).strftime("%Y-%m-%d %H:%M")
+    if row.get("median_reaction_time_ms") is not None:
+        row["median_reaction_time_ms"] = round(row["median_reaction_time_ms"])
+    if "prisms" in row:
+        row["break_recovery_pairs"] = " | ".join(
+            f"{prism_type.split('_')[1]} " + ", ".join(f"{b}-{r}" for b, r in prism["break_recovery_pairs"])
+            for prism_type, prism in row["prisms"].items() if prism["break_recovery_pairs"]
+        )
+    return row
+
+
+def _print_table(rows, columns):
+    print("  ".join(f"{column:>16}" for column in columns))
+    for row in rows:
+        print("  ".join(f"{'' if row[column] is None else row[column]!s:>16}" for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the stored session results.")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_FILE_PATH, help="configuration file with the database path")
+    parser.add_argument("--db", help="SQLite database (default: results_db of the configuration)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("patients", help="patients and number of sessions")
+    for name, help_text in (("sessions", "sessions of a patient, newest first"), ("trends", "max break and recovery of a patient over time")):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("--patient", help="patient id (default: sessions without patient)")
+        subparser.add_argument("--since", type=datetime.fromisoformat, help="only sessions from this date (YYYY-MM-DD)")
+        if name == "sessions":
+            subparser.add_argument("--limit", type=int)
+        else:
+            subparser.add_argument("--prism", choices=[prism_type.value for prism_type in PrismType])
+    args = parser.parse_args()
+
+    db = args.db or Config(args.config).results_db
+    if not db:
+        sys.exit("No results database configured")
+    store = ResultsStore(db)
+    since = args.since.timestamp() if getattr(args, "since", None) else None
+
+    if args.command == "patients":
+        rows = store.get_patients()
+        columns = ("patient_id", "sessions", "last_started_at")
+    elif args.command == "sessions":
+        rows = store.get_sessions(args.patient, since, args.limit)
+        columns = ("started_at", "game_type", "trials", "median_reaction_time_ms", "break_recovery_pairs")
+    else:
+        rows = store.get_trends(args.patient, args.prism, since)
+        columns = ("started_at", "game_type", "prism_type", "max_break", "max_recovery", "final_offset")
+    store.close()
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        _print_table([_format_row(row) for row in rows], columns)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Headless simulation of many sessions, to tune the offset staircase parameters of config.yaml.
+
+Usage (from the src directory):
+    python -m simulate --sessions 2000 --step 2 5 10 --initial-offset 0 20 --break-in 60 --break-out 120
+    python -m simulate --sessions 2000 --staircase fixed quest --observer psychometric --game-duration-sec 60
+
+Every combination of the given parameter values is simulated with the same simulated observer and seeds,
+across a process pool, and the aggregated break-recovery statistics are printed as JSON.
+"""
+import argparse
+import json
+import sys
+import time
+from config.config import Config, DEFAULT_CONFIG_FILE_PATH
+from enums.game_type import GameType
+from enums.prism_type import PrismType
+from enums.staircase_type import StaircaseType
+from simulation.engine import run_sweep
+from simulation.observers import HysteresisObserver, PsychometricObserver
+
+SWEEP_PARAMETERS = ("step", "min_offset", "max_offset", "initial_offset", "game_duration_sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate sessions with a simulated observer and a virtual clock.")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_FILE_PATH, help="base configuration file")
+    parser.add_argument("--game-type", default=GameType.BASE_IN.name, choices=[game_type.name for game_type in GameType])
+    parser.add_argument("--sessions", type=int, default=1000, help="sessions per parameter combination")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: number of CPUs)")
+    for name in SWEEP_PARAMETERS:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, nargs="+", help=f"values of {name} to sweep")
+    parser.add_argument("--staircase", nargs="+", choices=[staircase_type.value for staircase_type in StaircaseType],
+                        help="staircases to sweep")
+
+    parser.add_argument("--observer", default="hysteresis", choices=["hysteresis", "psychometric"])
+    parser.add_argument("--break-in", type=float, default=60, help="base-in break point (or threshold)")
+    parser.add_argument("--break-out", type=float, default=120, help="base-out break point (or threshold)")
+    parser.add_argument("--recovery-in", type=float, default=40, help="base-in recovery point (hysteresis observer)")
+    parser.add_argument("--recovery-out", type=float, default=90, help="base-out recovery point (hysteresis observer)")
+    parser.add_argument("--jitter", type=float, default=5.0, help="jitter (hysteresis) or slope (psychometric)")
+    parser.add_argument("--lapse-rate", type=float, default=0.02)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    cfg = Config(args.config)
+    break_points = {PrismType.BASE_IN: args.break_in, PrismType.BASE_OUT: args.break_out}
+    if args.observer == "hysteresis":
+        recovery_points = {PrismType.BASE_IN: args.recovery_in, PrismType.BASE_OUT: args.recovery_out}
+        observer = HysteresisObserver(break_points, recovery_points, args.jitter, args.lapse_rate)
+    else:
+        observer = PsychometricObserver(break_points, args.jitter, args.lapse_rate)
+
+    parameter_grid = {name: getattr(args, name) for name in SWEEP_PARAMETERS + ("staircase",) if getattr(args, name)}
+
+    start = time.perf_counter()
+    sweep = run_sweep(cfg, GameType[args.game_type], observer, args.sessions, parameter_grid, args.first_seed, args.workers)
+    elapsed = time.perf_counter() - start
+
+    output = json.dumps({"elapsed_sec": elapsed, "sweep": sweep}, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    print(output)
+    print(f"{len(sweep) * args.sessions} sessions in {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import copy
+import itertools
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from entities.vergence_session import VergenceSession
+from enums.prism_type import PrismType
+from simulation.virtual_clock import VirtualClock
+
+# Sessions simulated by every task submitted to the process pool
+_SESSIONS_PER_TASK = 250
+
+
+def simulate_session(cfg, game_type, observer, seed):
+    """
+    Simulate a session on a virtual clock, driving the same trial logic as FusionalVergenceGame without rendering.
+
+    :return: trials count, break-recovery pairs and final offset per prism type
+    :rtype: dict
+    """
+    observer.reset(random.Random(seed))
+    session = VergenceSession(cfg, game_type)
+    clock = VirtualClock()
+    trials = 0
+    while True:
+        prism = session.get_current_prism()
+        correct, response_time_sec = observer.answer(prism.prism_type, prism.offset)
+        # An answer given after the end of the game is not counted, as in the real game
+        if clock.advance(response_time_sec) >= cfg.game_duration_sec:
+            break
+        session.register_answer(correct, response_time_sec * 1000)
+        trials += 1
+    session.close_break_recovery_cycles()
+
+    return {
+        "trials": trials,
+        "prisms": {
+            prism_type.value: {
+                "break_recovery_pairs": list(prism.break_recovery_pairs),
+                "final_offset": prism.offset
+            }
+            for prism_type, prism in session.prism_dict.items()
+        }
+    }
+
+
+def _simulate_sessions(cfg, game_type, observer, seeds):
+    return [simulate_session(cfg, game_type, observer, seed) for seed in seeds]
+
+
+def _mean(values):
+    return statistics.fmean(values) if values else None
+
+
+def _stdev(values):
+    return statistics.stdev(values) if len(values) > 1 else None
+
+
+def aggregate(results):
+    """
+    Aggregate the break-recovery statistics of many simulated sessions.
+    """
+    summary = {
+        "sessions": len(results),
+        "trials_mean": _mean([result["trials"] for result in results]),
+        "prisms": {}
+    }
+    for prism_type in PrismType:
+        prism_results = [result["prisms"][prism_type.value] for result in results]
+        pairs = [pair for prism_result in prism_results for pair in prism_result["break_recovery_pairs"]]
+        breaks = [break_offset for break_offset, _ in pairs]
+        recoveries = [recovery_offset for _, recovery_offset in pairs]
+        final_offsets = [prism_result["final_offset"] for prism_result in prism_results]
+        summary["prisms"][prism_type.value] = {
+            "cycles_per_session_mean": len(pairs) / len(results) if results else None,
+            "break_mean": _mean(breaks),
+            "break_stdev": _stdev(breaks),
+            "recovery_mean": _mean(recoveries),
+            "recovery_stdev": _stdev(recoveries),
+            "final_offset_mean": _mean(final_offsets),
+            "final_offset_stdev": _stdev(final_offsets)
+        }
+    return summary
+
+
+def _chunk_seeds(first_seed, sessions):
+    seeds = range(first_seed, first_seed + sessions)
+    return [seeds[i:i + _SESSIONS_PER_TASK] for i in range(0, sessions, _SESSIONS_PER_TASK)]
+
+
+def run_sweep(cfg, game_type, observer, sessions, parameter_grid, first_seed=0, workers=None):
+    """
+    Simulate every combination of the parameter grid across a process pool.
+
+    :param cfg: base configuration, copied and overridden for every combination
+    :param parameter_grid: candidate values per Config attribute, e.g. {"step": [2, 5], "initial_offset": [0, 20]},
+                           an empty grid simulates the base configuration only
+    :type parameter_grid: dict[str, list]
+    :param workers: number of worker processes (default: number of CPUs)
+    :return: one entry per combination, with its parameters and aggregated statistics
+    :rtype: list[dict]
+    """
+    names = list(parameter_grid.keys())
+    combinations = list(itertools.product(*(parameter_grid[name] for name in names)))
+    sweep = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Submit every combination first, so that the whole sweep runs in parallel
+        pending = []
+        for values in combinations:
+            combination_cfg = copy.copy(cfg)
+            for name, value in zip(names, values):
+                setattr(combination_cfg, name, value)
+            futures = [
+                executor.submit(_simulate_sessions, combination_cfg, game_type, observer, seeds)
+                for seeds in _chunk_seeds(first_seed, sessions)
+            ]
+            pending.append((dict(zip(names, values)), futures))
+        for parameters, futures in pending:
+            results = [result for future in futures for result in future.result()]
+            sweep.append({"parameters": parameters, "summary": aggregate(results)})
+    return sweep
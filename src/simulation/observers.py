@@ -0,0 +1,95 @@
+import math
+from abc import ABC, abstractmethod
+from enums.prism_type import PrismType
+
+
+class BaseObserver(ABC):
+    """
+    Simulated patient answering the trials of a session.
+    """
+
+    def reset(self, rng):
+        """
+        Reset the observer state at the start of a session.
+
+        :param rng: random generator of the session
+        :type rng: random.Random
+        """
+        self.rng = rng
+
+    @abstractmethod
+    def answer(self, prism_type, offset):
+        """
+        Answer a trial.
+
+        :param prism_type: prism of the trial
+        :type prism_type: PrismType
+        :param offset: prism offset of the trial
+        :type offset: int
+        :return: (correct, response time in seconds)
+        :rtype: tuple[bool, float]
+        """
+        pass
+
+    def _response_time(self, mean_sec, sd_sec, min_sec):
+        return max(min_sec, self.rng.gauss(mean_sec, sd_sec))
+
+
+class PsychometricObserver(BaseObserver):
+    """
+    Memoryless observer: the probability of finding the square falls off as a logistic function of the offset 
+    around a break threshold, with a lapse rate for random mistakes.
+    """
+
+    def __init__(self, thresholds, slope=10.0, lapse_rate=0.02, response_time_sec=(1.5, 0.5, 0.3)):
+        """
+        :param thresholds: break threshold per PrismType
+        :type thresholds: dict[PrismType, float]
+        :param slope: spread of the psychometric function, in offset units
+        :param lapse_rate: probability of a wrong answer regardless of the offset
+        :param response_time_sec: (mean, standard deviation, minimum) of the response time
+        """
+        self.thresholds = thresholds
+        self.slope = slope
+        self.lapse_rate = lapse_rate
+        self.response_time_sec = response_time_sec
+
+    def answer(self, prism_type, offset):
+        p_seen = 1 / (1 + math.exp((offset - self.thresholds[prism_type]) / self.slope))
+        correct = self.rng.random() < (1 - self.lapse_rate) * p_seen
+        return correct, self._response_time(*self.response_time_sec)
+
+
+class HysteresisObserver(BaseObserver):
+    """
+    Observer with fusion hysteresis: fusion breaks above the break point and is recovered only below the lower
+    recovery point, both jittered at every trial.
+    """
+
+    def __init__(self, break_points, recovery_points, jitter=5.0, lapse_rate=0.02, response_time_sec=(1.5, 0.5, 0.3)):
+        """
+        :param break_points: offset at which fusion breaks, per PrismType
+        :type break_points: dict[PrismType, float]
+        :param recovery_points: offset at which fusion is recovered, per PrismType
+        :type recovery_points: dict[PrismType, float]
+        :param jitter: standard deviation of the trial-by-trial jitter of the break and recovery points
+        :param lapse_rate: probability of a wrong answer while fused
+        :param response_time_sec: (mean, standard deviation, minimum) of the response time
+        """
+        self.break_points = break_points
+        self.recovery_points = recovery_points
+        self.jitter = jitter
+        self.lapse_rate = lapse_rate
+        self.response_time_sec = response_time_sec
+
+    def reset(self, rng):
+        super().reset(rng)
+        self.fused = {prism_type: True for prism_type in PrismType}
+
+    def answer(self, prism_type, offset):
+        if self.fused[prism_type]:
+            self.fused[prism_type] = offset <= self.break_points[prism_type] + self.rng.gauss(0, self.jitter)
+        else:
+            self.fused[prism_type] = offset <= self.recovery_points[prism_type] + self.rng.gauss(0, self.jitter)
+        correct = self.fused[prism_type] and self.rng.random() >= self.lapse_rate
+        return correct, self._response_time(*self.response_time_sec)
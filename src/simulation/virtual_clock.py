@@ -0,0 +1,11 @@
+class VirtualClock:
+    """
+    Simulated clock, advanced explicitly instead of following the wall clock.
+    """
+
+    def __init__(self, start_sec=0.0):
+        self.now_sec = start_sec
+
+    def advance(self, duration_sec):
+        self.now_sec += duration_sec
+        return self.now_sec
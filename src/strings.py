@@ -7,6 +7,8 @@ class Strings:
     MSG_CORRECT = "Correct! (+)"
     MSG_WRONG = "Wrong! (-)"
     MSG_QUIT = "Press ESC to quit"
+    MSG_SEED = "Seed: {}"
+    MSG_REACTION_TIME = "Median reaction time: {:.0f} ms"
     
     FUSIONAL_VERGENCE_TITLE = "Fusional Vergence Game"
     
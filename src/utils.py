@@ -1,8 +1,75 @@
 import math
+import os
+import time
+import numpy as np
+import pygame
+from enums.renderer_type import RendererType
 
-def calc_disparity(cfg, screen_width, screen_height):
+def get_px_per_mm(cfg, screen_width, screen_height):
     screen_diagonal_mm = cfg.screen_diagonal_inch * 25.4
     screen_width_mm = screen_diagonal_mm / math.sqrt(1 + (screen_height / screen_width) ** 2)
-    px_per_mm = screen_width / screen_width_mm
+    return screen_width / screen_width_mm
+
+def calc_disparity(cfg, screen_width, screen_height):
+    px_per_mm = get_px_per_mm(cfg, screen_width, screen_height)
     disparity = int(round(cfg.interpupillary_dist_mm * px_per_mm * abs(cfg.z_screen_mm - cfg.z_object_mm) / cfg.z_object_mm))
-    return disparity
\ No newline at end of file
+    return disparity
+
+def calc_disparities(cfg, screen_width, screen_height, z_object_mm):
+    """
+    Vectorized calc_disparity: convert object distances from the observer to pixel disparities.
+    Unlike calc_disparity, the disparities are signed: positive in front of the screen (crossed disparity),
+    negative behind it.
+
+    :param z_object_mm: distances of the objects, e.g. a per-pixel depth map
+    :type z_object_mm: numpy.ndarray
+    :return: disparities with the same shape, in pixels
+    :rtype: numpy.ndarray
+    """
+    px_per_mm = get_px_per_mm(cfg, screen_width, screen_height)
+    z_object_mm = np.asarray(z_object_mm, dtype=np.float64)
+    disparities = cfg.interpupillary_dist_mm * px_per_mm * (cfg.z_screen_mm - z_object_mm) / z_object_mm
+    return np.rint(disparities).astype(np.int32)
+
+def set_display_mode(cfg, size=None, fullscreen=False):
+    """
+    Set the display mode required by the configured renderer and return the screen surface.
+    The texture renderer draws with the SDL renderer that pygame.SCALED attaches to the window, with vsync if
+    configured and available.
+
+    :param size: size of the window, the desktop size if None
+    """
+    flags = pygame.FULLSCREEN if fullscreen else 0
+    if RendererType(cfg.renderer) != RendererType.TEXTURE:
+        return pygame.display.set_mode(size or (0, 0), flags)
+    if pygame.display.get_surface() is not None:
+        # A window created without SCALED cannot get an SDL renderer: it is recreated
+        pygame.display.quit()
+        pygame.display.init()
+    # SCALED does not accept the (0, 0) size
+    size = size or pygame.display.get_desktop_sizes()[0]
+    if cfg.vsync:
+        try:
+            return pygame.display.set_mode(size, flags | pygame.SCALED, vsync=1)
+        except pygame.error:
+            # vsync is not available on every platform and driver
+            pass
+    return pygame.display.set_mode(size, flags | pygame.SCALED)
+
+def get_session_name(prefix, directory, extension):
+    """
+    Return a unique name for the files of a session starting now: <prefix>_<date>_<time>_<milliseconds>,
+    suffixed by a counter if <directory>/<name><extension> already exists.
+
+    :param directory: directory of the session files, None if not known
+    :param extension: extension of the file checked for uniqueness, e.g. ".json"
+    :rtype: str
+    """
+    now = time.time()
+    name = f"{prefix}_{time.strftime('%Y%m%d_%H%M%S', time.localtime(now))}_{int(now * 1000) % 1000:03d}"
+    unique_name = name
+    count = 1
+    while directory is not None and os.path.exists(os.path.join(directory, unique_name + extension)):
+        count += 1
+        unique_name = f"{name}_{count}"
+    return unique_name
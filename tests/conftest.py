@@ -0,0 +1,48 @@
+import os
+import sys
+import pygame
+import pytest
+import yaml
+
+# The sources use absolute imports from the src directory, and pygame must run without a display
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from config.config import Config, DEFAULT_CONFIG_FILE_PATH
+from entities.font_registry import FontRegistry
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    """
+    Return a factory of configurations: the default one with the given overrides, writing nothing outside tmp_path.
+    """
+    def make_config(**overrides):
+        with open(DEFAULT_CONFIG_FILE_PATH, "r") as file:
+            config_data = yaml.safe_load(file)
+        config_data.update(
+            stimulus_bank_dir=str(tmp_path / "stimulus_bank"),
+            results_db=None,
+            recordings_dir=str(tmp_path / "recordings"),
+            instrumentation_dir=str(tmp_path / "instrumentation"),
+            game_duration_sec=60
+        )
+        config_data.update(overrides)
+        path = tmp_path / "config.yaml"
+        with open(path, "w") as file:
+            yaml.safe_dump(config_data, file)
+        return Config(str(path))
+
+    return make_config
+
+
+@pytest.fixture
+def screen():
+    """
+    A small display surface, closed with the fonts loaded on it at the end of the test.
+    """
+    pygame.init()
+    yield pygame.display.set_mode((800, 600))
+    FontRegistry.clear()
+    pygame.quit()
@@ -0,0 +1,42 @@
+import threading
+import numpy as np
+import pygame
+from enums.game_type import GameType
+from games.fusional_vergence_game import FusionalVergenceGame
+
+
+def _assert_layers_match_trial(game):
+    for layer in (game.red_layer, game.blue_layer):
+        expected = layer.create_pixels(game._get_trial_noise(game.trial_index), game.square_rel_x, game.square_rel_y)
+        channel = pygame.surfarray.array_red(layer.surface) if layer.is_red() else pygame.surfarray.array_blue(layer.surface)
+        np.testing.assert_array_equal(channel.T, expected)
+
+
+def test_trials_with_the_same_noise_update_the_square_regions(make_config, screen):
+    game = FusionalVergenceGame(make_config(noise_seed=1), screen, GameType.BASE_IN)
+    assert game.stimulus_producer is None
+    surfaces = (game.red_layer_surface, game.blue_layer_surface)
+    for _ in range(5):
+        game._next_trial()
+        _assert_layers_match_trial(game)
+    assert (game.red_layer_surface, game.blue_layer_surface) == surfaces
+
+
+def test_a_prefetch_miss_does_not_wait_for_the_producer(make_config, screen):
+    game = FusionalVergenceGame(make_config(noise_seed=1, refresh_noise_per_trial=True), screen, GameType.BASE_IN)
+    release = threading.Event()
+    create_trial = game.stimulus_producer.create_trial
+
+    def slow_create_trial(trial_index):
+        release.wait()
+        return create_trial(trial_index)
+
+    game.stimulus_producer.create_trial = slow_create_trial
+    game.stimulus_producer.start()
+    try:
+        game._next_trial()
+        _assert_layers_match_trial(game)
+        assert game.stimulus_producer.miss_count == 1
+    finally:
+        release.set()
+        game.stimulus_producer.stop()
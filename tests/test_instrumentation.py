@@ -0,0 +1,23 @@
+import os
+from entities.instrumentation import Instrumentation
+
+
+def test_sessions_are_named_when_they_start_and_never_overwritten(tmp_path):
+    instrumentation = Instrumentation(True, str(tmp_path))
+    paths = set()
+    for _ in range(3):
+        instrumentation.reset()
+        # Prepared in advance: not named yet
+        assert instrumentation.session_name is None
+        instrumentation.start()
+        instrumentation.record(Instrumentation.FRAME, 16.0)
+        paths.update(instrumentation.export())
+    assert len(paths) == 6
+    assert all(os.path.exists(path) for path in paths)
+
+
+def test_export_names_a_session_never_started(tmp_path):
+    instrumentation = Instrumentation(True, str(tmp_path))
+    instrumentation.record(Instrumentation.FRAME, 16.0)
+    json_path, _ = instrumentation.export()
+    assert os.path.basename(json_path).startswith("session_")
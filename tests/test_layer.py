@@ -0,0 +1,75 @@
+import numpy as np
+import pygame
+import pytest
+from entities.layer import Layer
+from enums.layer_type import LayerType
+from renderers.anaglyph_compositor import AnaglyphCompositor
+
+WIDTH, HEIGHT, SQUARE_SIZE = 60, 40, 10
+
+
+def _reference_pixels(noise, layer_type, square_size, disparity, square_rel_x, square_rel_y):
+    """
+    Per-pixel definition of the layers, as in the original implementation.
+    """
+    height, width = noise.shape
+    pixels = noise.copy()
+    if layer_type != LayerType.BLUE:
+        return pixels
+    for y in range(height):
+        for x in range(width):
+            inside_square = (square_rel_x + disparity <= x < square_rel_x + disparity + square_size and
+                             square_rel_y <= y < square_rel_y + square_size)
+            if inside_square and 0 <= x - disparity < width:
+                pixels[y, x] = noise[y, x - disparity]
+    return pixels
+
+
+@pytest.fixture
+def noise():
+    return np.random.default_rng(0).integers(0, 255, size=(HEIGHT, WIDTH), endpoint=True, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("disparity, square_rel_x, square_rel_y", [
+    (4, 20, 10),
+    (-4, 20, 10),
+    # Past the left edge, partially and completely
+    (-6, 2, 0),
+    (-30, 5, 30),
+    # Past the right edge, partially and completely
+    (8, WIDTH - SQUARE_SIZE, 5),
+    (40, 30, 5),
+])
+def test_create_pixels_matches_the_per_pixel_definition(noise, disparity, square_rel_x, square_rel_y):
+    for layer_type in LayerType:
+        layer = Layer(None, layer_type, WIDTH, HEIGHT, SQUARE_SIZE, disparity)
+        expected = _reference_pixels(noise, layer_type, SQUARE_SIZE, disparity, square_rel_x, square_rel_y)
+        np.testing.assert_array_equal(layer.create_pixels(noise, square_rel_x, square_rel_y), expected)
+
+
+@pytest.mark.parametrize("disparity", [-6, 6])
+def test_update_surface_matches_a_full_redraw_at_the_edges(noise, disparity):
+    layer = Layer(None, LayerType.BLUE, WIDTH, HEIGHT, SQUARE_SIZE, disparity)
+    layer.create_surface(noise, 0, 0)
+    for square_rel_x, square_rel_y in [(WIDTH - SQUARE_SIZE, 5), (1, HEIGHT - SQUARE_SIZE), (25, 12)]:
+        surface = layer.update_surface(noise, square_rel_x, square_rel_y)
+        expected = _reference_pixels(noise, LayerType.BLUE, SQUARE_SIZE, disparity, square_rel_x, square_rel_y)
+        np.testing.assert_array_equal(pygame.surfarray.array_blue(surface).T, expected)
+
+
+def test_surfaces_are_unlocked_after_every_update(noise, screen):
+    red_layer = Layer(None, LayerType.RED, WIDTH, HEIGHT, SQUARE_SIZE, 4)
+    blue_layer = Layer(None, LayerType.BLUE, WIDTH, HEIGHT, SQUARE_SIZE, 4)
+    for layer in (red_layer, blue_layer):
+        layer.create_surface(noise, 0, 0)
+        layer.redraw_surface(noise, 10, 10)
+        layer.update_surface(noise, 20, 5)
+        layer.get_checksum()
+        assert not layer.surface.get_locked()
+        # A locked surface cannot be blitted
+        screen.blit(layer.surface, (0, 0))
+
+    compositor = AnaglyphCompositor(screen, 1, dot_size=2)
+    composite, _ = compositor.compose(red_layer.create_pixels(noise, 20, 5), blue_layer.create_pixels(noise, 20, 5), 3)
+    assert not composite.get_locked()
+    screen.blit(composite, (0, 0))
@@ -0,0 +1,61 @@
+import math
+import random
+import pytest
+from config.config import Config
+from entities.quest_staircase import QuestStaircase
+from entities.vergence_session import VergenceSession
+from enums.game_type import GameType
+from enums.prism_type import PrismType
+from simulation.engine import simulate_session
+from simulation.observers import PsychometricObserver
+
+
+def _quest_config():
+    cfg = Config()
+    cfg.staircase = "quest"
+    return cfg
+
+
+@pytest.mark.parametrize("threshold", [60, 120, 300])
+def test_posterior_converges_on_the_observer_threshold(threshold):
+    rng = random.Random(threshold)
+    staircase = QuestStaircase(0, 800, 5, 1, 10, 0.02, 0.02, 0, 100)
+    offset = 0
+    for _ in range(60):
+        p_correct = 0.02 + 0.96 / (1 + math.exp((offset - threshold) / 10))
+        staircase.update(offset, rng.random() < p_correct)
+        offset = staircase.next_offset()
+
+    estimate = staircase.get_threshold_estimate()
+    posterior = staircase.get_posterior()
+    sd = math.sqrt(posterior @ (staircase.thresholds - estimate) ** 2)
+    assert abs(estimate - threshold) < 10
+    assert sd < 10
+    # The next offsets are placed around the threshold
+    assert abs(offset - threshold) < 30
+
+
+def test_quest_sessions_record_break_recovery_cycles():
+    thresholds = {PrismType.BASE_IN: 100, PrismType.BASE_OUT: 250}
+    result = simulate_session(_quest_config(), GameType.JUMP_DUCTION, PsychometricObserver(thresholds), seed=1)
+    for prism_type, threshold in thresholds.items():
+        pairs = result["prisms"][prism_type.value]["break_recovery_pairs"]
+        assert len(pairs) >= 5
+        assert all(break_offset >= recovery_offset for break_offset, recovery_offset in pairs)
+        assert abs(sum(break_offset for break_offset, _ in pairs) / len(pairs) - threshold) < 20
+
+
+def test_quest_cycle_goes_from_fusion_to_recovery():
+    session = VergenceSession(_quest_config(), GameType.BASE_IN)
+    prism = session.get_current_prism()
+    reached = []
+    for correct in (True, True, False, False, True):
+        reached.append((prism.offset, correct))
+        session.register_answer(correct)
+    assert len(prism.break_recovery_pairs) == 1
+    break_offset, recovery_offset = prism.break_recovery_pairs[0]
+    # The break is the highest offset reached while fused (up to the first wrong answer), the recovery the lowest
+    # one reached while not fused (up to the next correct answer)
+    assert break_offset == max(offset for offset, _ in reached[:3])
+    assert recovery_offset == min(offset for offset, _ in reached[3:])
+    assert prism.direction
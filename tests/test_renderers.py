@@ -0,0 +1,133 @@
+import time
+import pygame
+import pytest
+from enums.game_type import GameType
+from enums.renderer_type import RendererType
+from games.fusional_vergence_game import FusionalVergenceGame
+from renderers.dirty_rect_renderer import DirtyRectRenderer
+from renderers.full_frame_renderer import FullFrameRenderer
+
+
+def _render_game_frames(make_config, screen, monkeypatch, renderer_type):
+    """
+    Render a scene sequence (cursor moves, answers changing the trial and the HUD, timer changes)
+    and return a copy of every frame.
+    """
+    mouse_pos = [(400, 300)]
+    monkeypatch.setattr(pygame.mouse, "get_pos", lambda: mouse_pos[0])
+    game = FusionalVergenceGame(make_config(noise_seed=3, renderer=renderer_type.value), screen, GameType.JUMP_DUCTION)
+    frames = []
+
+    def draw():
+        game._draw_scene()
+        frames.append(pygame.surfarray.array3d(screen))
+
+    draw()
+    for step in range(12):
+        mouse_pos[0] = (400 + 37 * step, 300 - 11 * step)
+        draw()
+        if step % 3 == 0:
+            # Alternately on and off the square
+            x = game.layer_x + (game.square_rel_x + game.square_size // 2) * game.dot_size if step % 2 == 0 else 0
+            y = game.layer_y + (game.square_rel_y + game.square_size // 2) * game.dot_size
+            game._on_mouse_click(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x, y), button=1, timestamp=time.perf_counter()))
+            draw()
+        if step % 4 == 0:
+            game.time_left -= 1
+            draw()
+        # An unchanged frame
+        draw()
+    return frames
+
+
+def test_dirty_rect_frames_match_full_frames(make_config, screen, monkeypatch):
+    full_frames = _render_game_frames(make_config, screen, monkeypatch, RendererType.FULL_FRAME)
+    dirty_frames = _render_game_frames(make_config, screen, monkeypatch, RendererType.DIRTY_RECT)
+    assert len(full_frames) == len(dirty_frames)
+    for index, (full_frame, dirty_frame) in enumerate(zip(full_frames, dirty_frames)):
+        assert (full_frame == dirty_frame).all(), f"frame {index} differs"
+
+
+def _surface(size, color, flags=0):
+    surface = pygame.Surface(size, flags)
+    surface.fill(color)
+    return surface
+
+
+def _draw(renderer, scene):
+    renderer.begin_frame()
+    for key, surface, dest, special_flags, version in scene:
+        renderer.blit(key, surface, dest, special_flags, version)
+    renderer.end_frame()
+
+
+@pytest.fixture
+def display_calls(monkeypatch):
+    """
+    Count the full (flip) and partial (update) presentations of the display.
+    """
+    calls = {"flip": 0, "update": 0}
+    flip, update = pygame.display.flip, pygame.display.update
+
+    def counting_flip():
+        calls["flip"] += 1
+        flip()
+
+    def counting_update(*args):
+        calls["update"] += 1
+        update(*args)
+
+    monkeypatch.setattr(pygame.display, "flip", counting_flip)
+    monkeypatch.setattr(pygame.display, "update", counting_update)
+    return calls
+
+
+def test_dirty_rects_redraw_overlapping_elements_in_order(screen, display_calls):
+    full_screen = pygame.Surface(screen.get_size())
+    dirty_screen = pygame.Surface(screen.get_size())
+    full_renderer = FullFrameRenderer(full_screen, (0, 0, 0))
+    dirty_renderer = DirtyRectRenderer(dirty_screen, (0, 0, 0))
+    background = _surface((300, 200), (0, 0, 120))
+    # Two versions of the same text surface, re-rendered in place
+    text = _surface((60, 20), (200, 200, 200))
+    cursor = _surface((16, 16), (255, 0, 0))
+
+    frame_count = 7
+    for step in range(frame_count):
+        text.fill((200, 200 - 40 * (step // 2), 200))
+        scene = [
+            ("layers", background, (100, 100), 0, 1),
+            # Overlaps the layers and the text
+            ("cursor", cursor, (110 + 20 * step, 105), pygame.BLEND_ADD, None),
+            # Overlaps the layers, drawn after them
+            ("text", text, (120, 110), 0, step // 2),
+        ]
+        if step == frame_count - 1:
+            # The cursor leaves the scene
+            del scene[1]
+        _draw(full_renderer, scene)
+        _draw(dirty_renderer, scene)
+        assert (pygame.surfarray.array3d(full_screen) == pygame.surfarray.array3d(dirty_screen)).all(), f"frame {step} differs"
+    # Only the first frame of each renderer is a full redraw
+    assert display_calls["flip"] == frame_count + 1
+    assert display_calls["update"] == frame_count - 1
+
+
+def test_large_changes_switch_to_a_full_redraw(screen, display_calls):
+    renderer = DirtyRectRenderer(pygame.Surface(screen.get_size()), (0, 0, 0))
+    width, height = screen.get_size()
+    small = _surface((10, 10), (255, 255, 255))
+    large = _surface((width, height * 2 // 3), (0, 255, 0))
+
+    _draw(renderer, [("large", large, (0, 0), 0, 1), ("small", small, (0, 0), 0, None)])
+    _draw(renderer, [("large", large, (0, 0), 0, 1), ("small", small, (20, 0), 0, None)])
+    assert display_calls == {"flip": 1, "update": 1}
+    # The large element changes: more than half of the screen is dirty
+    _draw(renderer, [("large", large, (0, 0), 0, 2), ("small", small, (20, 0), 0, None)])
+    assert display_calls == {"flip": 2, "update": 1}
+    # Nothing changes: nothing is presented
+    _draw(renderer, [("large", large, (0, 0), 0, 2), ("small", small, (20, 0), 0, None)])
+    assert display_calls == {"flip": 2, "update": 1}
+    renderer.invalidate()
+    _draw(renderer, [("large", large, (0, 0), 0, 2), ("small", small, (20, 0), 0, None)])
+    assert display_calls == {"flip": 3, "update": 1}
@@ -0,0 +1,61 @@
+import json
+import os
+from entities.results_store import ResultsStore, ResultsWriter, SessionResult
+
+
+def _result(patient_id="P1", started_at=1000.0):
+    return SessionResult(patient_id, started_at, "BASE_IN", 7, 180.0, 20, 850.0, {"BASE_IN": (15, [(20, 10), (25, 15)])})
+
+
+def test_writer_stores_the_results(tmp_path):
+    path = str(tmp_path / "results.db")
+    writer = ResultsWriter(path, str(tmp_path / "pending.jsonl"))
+    writer.submit(_result(started_at=1.0))
+    writer.submit(_result(started_at=2.0))
+    writer.close()
+
+    store = ResultsStore(path)
+    try:
+        sessions = store.get_sessions("P1")
+        assert [session["started_at"] for session in sessions] == [2.0, 1.0]
+        assert sessions[0]["prisms"]["BASE_IN"] == {"final_offset": 15, "break_recovery_pairs": [[20, 10], [25, 15]]}
+    finally:
+        store.close()
+
+
+def test_writer_falls_back_to_a_file_when_the_database_cannot_be_opened(tmp_path):
+    fallback_path = str(tmp_path / "pending.jsonl")
+    writer = ResultsWriter(str(tmp_path / "missing_dir" / "results.db"), fallback_path)
+    # Neither submit nor close raise, and the writer keeps accepting results after the failure
+    writer.submit(_result(started_at=1.0))
+    writer.submit(_result(started_at=2.0))
+    writer.close()
+
+    assert writer.error is not None
+    with open(fallback_path, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert [record["started_at"] for record in records] == [1.0, 2.0]
+    assert SessionResult.from_dict(records[0]).prisms == _result().prisms
+
+
+def test_writer_imports_the_fallback_once_the_database_can_be_opened(tmp_path):
+    db_dir = tmp_path / "db"
+    path = str(db_dir / "results.db")
+    fallback_path = str(tmp_path / "pending.jsonl")
+    writer = ResultsWriter(path, fallback_path)
+    writer.submit(_result(started_at=1.0))
+    writer.close()
+    assert os.path.isfile(fallback_path)
+
+    db_dir.mkdir()
+    writer = ResultsWriter(path, fallback_path)
+    writer.submit(_result(started_at=2.0))
+    writer.close()
+
+    assert writer.error is None
+    assert not os.path.exists(fallback_path)
+    store = ResultsStore(path)
+    try:
+        assert [session["started_at"] for session in store.get_sessions("P1")] == [2.0, 1.0]
+    finally:
+        store.close()
@@ -0,0 +1,47 @@
+import threading
+import pytest
+from entities.session_manager import SessionManager
+from enums.game_type import GameType
+from games.base_game import BaseGame
+from games.fusional_vergence_game import FusionalVergenceGame
+
+
+def test_only_the_stimuli_are_prepared_in_background(monkeypatch, make_config, screen):
+    threads = {}
+    create_renderer = BaseGame._create_renderer
+    prepare_stimuli = FusionalVergenceGame.prepare_stimuli
+
+    def record(name, method):
+        def wrapper(game, *args):
+            threads.setdefault(name, []).append(threading.current_thread())
+            return method(game, *args)
+        return wrapper
+
+    monkeypatch.setattr(BaseGame, "_create_renderer", record("create_renderer", create_renderer))
+    monkeypatch.setattr(BaseGame, "_reset_state", record("reset_state", BaseGame._reset_state))
+    monkeypatch.setattr(FusionalVergenceGame, "prepare_stimuli", record("prepare_stimuli", prepare_stimuli))
+
+    manager = SessionManager(make_config(), screen)
+    manager.prepare()
+    game = manager.acquire(GameType.BASE_OUT)
+    manager.prepare()
+    assert manager.acquire(GameType.JUMP_DUCTION) is game
+    manager.close()
+
+    main_thread = threading.main_thread()
+    assert threads["create_renderer"] == [main_thread]
+    assert all(thread is main_thread for thread in threads["reset_state"])
+    assert len(threads["prepare_stimuli"]) == 2
+    assert all(thread is not main_thread for thread in threads["prepare_stimuli"])
+    assert game.game_type == GameType.JUMP_DUCTION
+    assert game.noise_matrix is not None and game.red_layer_surface is not None
+
+
+def test_acquire_raises_the_preparation_error(monkeypatch, make_config, screen):
+    def prepare_stimuli(game):
+        raise ValueError("broken stimuli")
+
+    monkeypatch.setattr(FusionalVergenceGame, "prepare_stimuli", prepare_stimuli)
+    manager = SessionManager(make_config(), screen)
+    with pytest.raises(ValueError):
+        manager.acquire(GameType.BASE_IN)
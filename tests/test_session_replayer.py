@@ -0,0 +1,59 @@
+import glob
+import gzip
+import json
+import os
+import pygame
+import pytest
+from entities.session_replayer import SessionReplayer
+from enums.game_type import GameType
+from games.fusional_vergence_game import FusionalVergenceGame
+
+
+def _record_session(make_config, screen, game_type, **overrides):
+    """
+    Run a short session with recorded clicks, on the square in two trials out of three, and return the path
+    of its recording.
+    """
+    cfg = make_config(record_sessions=True, game_duration_sec=1, **overrides)
+    game = FusionalVergenceGame(cfg, screen, game_type)
+    for trial_index in range(12):
+        square_rel_x, square_rel_y = game._get_square_position(trial_index)
+        if trial_index % 3 == 2:
+            square_rel_x = square_rel_x + game.square_size * 2 if square_rel_x < game.square_size * 2 else 0
+        x = game.layer_x + (square_rel_x + game.square_size // 2) * game.dot_size
+        y = game.layer_y + (square_rel_y + game.square_size // 2) * game.dot_size
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x, y), button=1))
+    game.run()
+    recordings = glob.glob(os.path.join(cfg.recordings_dir, "*.jsonl.gz"))
+    assert len(recordings) == 1
+    return recordings[0]
+
+
+@pytest.mark.parametrize("game_type, overrides", [
+    (GameType.BASE_IN, {}),
+    (GameType.JUMP_DUCTION, {"staircase": "quest"}),
+    (GameType.BASE_OUT, {"refresh_noise_per_trial": True}),
+    (GameType.BASE_IN, {"dynamic_noise": True, "dynamic_noise_frames": 4}),
+])
+def test_recorded_session_replays_without_differences(make_config, screen, game_type, overrides):
+    path = _record_session(make_config, screen, game_type, **overrides)
+    replayer = SessionReplayer(path)
+    assert [click["correct"] for click in replayer.clicks] == [True, True, False] * 4
+
+    result = replayer.replay(screen)
+    assert result.mismatches == []
+    assert result.ok and result.clicks == 12
+
+
+def test_replay_reports_a_different_stimulus(make_config, screen, tmp_path):
+    path = _record_session(make_config, screen, GameType.BASE_IN)
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    records[3]["checksum"] ^= 1
+    tampered_path = str(tmp_path / "tampered.jsonl.gz")
+    with gzip.open(tampered_path, "wt", encoding="utf-8") as file:
+        file.writelines(json.dumps(record) + "\n" for record in records)
+
+    result = SessionReplayer(tampered_path).replay(screen)
+    assert not result.ok
+    assert len(result.mismatches) == 1 and "checksum" in result.mismatches[0]
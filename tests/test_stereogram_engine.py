@@ -0,0 +1,59 @@
+import numpy as np
+from entities.layer import Layer
+from entities.stereogram_engine import StereogramEngine
+from enums.layer_type import LayerType
+
+WIDTH, HEIGHT = 48, 32
+
+
+def _reference_blue_pixels(noise, disparity_map):
+    """
+    Per-pixel definition: every pixel moves by its disparity and the nearest one (largest disparity) is visible,
+    the destinations that no pixel reaches keep the noise.
+    """
+    blue_pixels = noise.copy()
+    depth = np.full(noise.shape, np.iinfo(np.int64).min)
+    for y in range(noise.shape[0]):
+        for x in range(noise.shape[1]):
+            destination_x = x + int(disparity_map[y, x])
+            if 0 <= destination_x < noise.shape[1] and disparity_map[y, x] > depth[y, destination_x]:
+                depth[y, destination_x] = disparity_map[y, x]
+                blue_pixels[y, destination_x] = noise[y, x]
+    return blue_pixels
+
+
+def _noise(seed=0):
+    return np.random.default_rng(seed).integers(0, 255, size=(HEIGHT, WIDTH), endpoint=True, dtype=np.uint8)
+
+
+def test_square_matches_the_layer():
+    noise = _noise()
+    disparity_map = np.zeros((HEIGHT, WIDTH), dtype=np.int32)
+    disparity_map[8:18, 10:20] = 4
+    _, blue_pixels = StereogramEngine(WIDTH, HEIGHT).create_pixels(noise, disparity_map)
+    layer = Layer(None, LayerType.BLUE, WIDTH, HEIGHT, 10, 4)
+    np.testing.assert_array_equal(blue_pixels, layer.create_pixels(noise, 10, 8))
+
+
+def test_target_behind_the_screen_is_hidden_by_the_background():
+    noise = _noise(1)
+    disparity_map = np.zeros((HEIGHT, WIDTH), dtype=np.int32)
+    disparity_map[8:18, 10:20] = -3
+    _, blue_pixels = StereogramEngine(WIDTH, HEIGHT).create_pixels(noise, disparity_map)
+
+    # The leftmost pixels of the target would land on the background at disparity 0, which is nearer
+    np.testing.assert_array_equal(blue_pixels[8:18, 7:10], noise[8:18, 7:10])
+    np.testing.assert_array_equal(blue_pixels[8:18, 10:17], noise[8:18, 13:20])
+    np.testing.assert_array_equal(blue_pixels, _reference_blue_pixels(noise, disparity_map))
+
+
+def test_overlapping_depths_match_the_per_pixel_definition():
+    rng = np.random.default_rng(2)
+    noise = _noise(2)
+    disparity_map = np.zeros((HEIGHT, WIDTH), dtype=np.int32)
+    for _ in range(12):
+        x, y = rng.integers(0, WIDTH - 8), rng.integers(0, HEIGHT - 8)
+        disparity_map[y:y + 8, x:x + 8] = rng.integers(-6, 7)
+    red_pixels, blue_pixels = StereogramEngine(WIDTH, HEIGHT).create_pixels(noise, disparity_map)
+    np.testing.assert_array_equal(red_pixels, noise)
+    np.testing.assert_array_equal(blue_pixels, _reference_blue_pixels(noise, disparity_map))
@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+import numpy as np
+from entities.noise_field import NoiseField
+from entities.stimulus_bank import StimulusBank
+
+
+def _build(bank, seeds, frame_count=0):
+    for seed in seeds:
+        bank.build(NoiseField(16, 8, 255, seed), frame_count)
+
+
+def test_random_sessions_need_enough_banked_seeds(tmp_path):
+    bank = StimulusBank(str(tmp_path), 10, min_seeds=3)
+    _build(bank, [1, 2])
+    assert bank.choose_seed(16, 8, 255) is None
+    _build(bank, [3])
+    assert bank.choose_seed(16, 8, 255) in {1, 2, 3}
+    # Frames that were not banked are not available
+    assert bank.choose_seed(16, 8, 255, frame_count=4) is None
+
+
+def test_seeds_rotate_least_recently_used_first(tmp_path):
+    bank = StimulusBank(str(tmp_path), 10, min_seeds=3)
+    _build(bank, [1, 2, 3])
+    used = []
+    for _ in range(3):
+        seed = bank.choose_seed(16, 8, 255)
+        assert bank.get_noise(NoiseField(16, 8, 255, seed)) is not None
+        used.append(seed)
+    assert sorted(used) == [1, 2, 3]
+    assert bank.choose_seed(16, 8, 255) == used[0]
+
+
+def test_mapped_noise_matches_the_generated_noise(tmp_path):
+    bank = StimulusBank(str(tmp_path), 10)
+    noise_field = NoiseField(16, 8, 255, 7)
+    bank.build(noise_field, frame_count=2)
+    np.testing.assert_array_equal(bank.get_noise(noise_field), noise_field.generate(0))
+    np.testing.assert_array_equal(bank.get_frames(noise_field, 2), noise_field.generate_frames(2))
+    assert bank.get_frames(noise_field, 3) is None
+    assert bank.get_noise(NoiseField(16, 8, 255, 8)) is None
+
+
+def test_least_recently_used_seeds_are_evicted(tmp_path):
+    seed_size = StimulusBank(str(tmp_path / "probe"), 10).build(NoiseField(16, 8, 255, 0))
+    bank = StimulusBank(str(tmp_path / "bank"), 2.5 * seed_size / 2 ** 20)
+    _build(bank, [1, 2])
+    bank.get_noise(NoiseField(16, 8, 255, 1))
+    _build(bank, [3])
+    assert sorted(bank.get_seeds(16, 8, 255)) == [1, 3]
+    assert not os.path.exists(os.path.join(bank.path, bank.get_key(16, 8, 255), "2"))
+
+
+def test_index_persists_and_can_be_rebuilt(tmp_path):
+    _build(StimulusBank(str(tmp_path), 10), [1, 2])
+    assert sorted(StimulusBank(str(tmp_path), 10).get_seeds(16, 8, 255)) == [1, 2]
+
+    os.remove(os.path.join(str(tmp_path), StimulusBank.INDEX_FILE_NAME))
+    bank = StimulusBank(str(tmp_path), 10)
+    assert sorted(bank.get_seeds(16, 8, 255)) == [1, 2]
+    assert os.path.exists(os.path.join(str(tmp_path), StimulusBank.INDEX_FILE_NAME))
+    assert bank.reindex() == 2
+
+
+def test_disabled_bank_is_empty(tmp_path):
+    bank = StimulusBank(None, 10)
+    assert bank.build(NoiseField(16, 8, 255, 1)) == 0
+    assert bank.choose_seed(16, 8, 255) is None
+    assert bank.get_size() == 0 and bank.evict() == 0
+
+
+def _build_in_process(path, seeds):
+    _build(StimulusBank(path, 10), seeds)
+
+
+def test_concurrent_processes_keep_every_entry(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_build_in_process, args=(str(tmp_path), range(start, start + 10))) for start in range(0, 40, 10)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    assert sorted(StimulusBank(str(tmp_path), 10).get_seeds(16, 8, 255)) == list(range(40))
+
+
+def test_index_is_saved_only_when_changed(tmp_path, monkeypatch):
+    bank = StimulusBank(str(tmp_path), 10)
+    noise_field = NoiseField(16, 8, 255, 1)
+    bank.build(noise_field, frame_count=2)
+    saves = []
+    save_index = StimulusBank._save_index
+    monkeypatch.setattr(StimulusBank, "_save_index", lambda self: saves.append(1) or save_index(self))
+
+    bank.build(noise_field, frame_count=2)
+    assert bank.evict() == 0
+    assert bank.get_frames(noise_field, 2) is not None
+    assert saves == []
+    assert bank.get_noise(noise_field) is not None
+    assert saves == [1]
+
+
+def test_update_rebuilds_a_deleted_index(tmp_path):
+    _build(StimulusBank(str(tmp_path), 10), [1])
+    os.remove(os.path.join(str(tmp_path), StimulusBank.INDEX_FILE_NAME))
+    bank = StimulusBank(str(tmp_path), 10)
+    _build(bank, [2])
+    assert sorted(StimulusBank(str(tmp_path), 10).get_seeds(16, 8, 255)) == [1, 2]
@@ -0,0 +1,74 @@
+import threading
+import time
+from entities.stimulus_producer import StimulusProducer, Trial
+
+
+def _create_trial(trial_index):
+    return Trial(trial_index, 0, 0, None, None, None)
+
+
+def _wait_until(condition, timeout_sec=5):
+    deadline = time.perf_counter() + timeout_sec
+    while not condition():
+        assert time.perf_counter() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_pop_returns_trials_in_order():
+    producer = StimulusProducer(_create_trial, 1, 2)
+    producer.start()
+    try:
+        trials = []
+        for trial_index in range(1, 6):
+            _wait_until(lambda: producer.queue_depth > 0)
+            trials.append(producer.pop(trial_index).trial_index)
+        assert trials == [1, 2, 3, 4, 5]
+        assert producer.hit_count == 5 and producer.miss_count == 0
+    finally:
+        producer.stop()
+
+
+def test_pop_does_not_wait_on_a_miss():
+    release = threading.Event()
+    created = []
+
+    def create_trial(trial_index):
+        created.append(trial_index)
+        release.wait()
+        return _create_trial(trial_index)
+
+    producer = StimulusProducer(create_trial, 1, 2)
+    producer.start()
+    try:
+        start = time.perf_counter()
+        assert producer.pop(1) is None
+        assert time.perf_counter() - start < 0.05
+        assert producer.miss_count == 1
+        # The caller built trial 1 itself: the worker discards its copy and goes on with trial 2
+        release.set()
+        _wait_until(lambda: producer.queue_depth > 0)
+        assert producer.pop(2).trial_index == 2
+        assert 1 in created and producer.hit_count == 1
+    finally:
+        release.set()
+        producer.stop()
+
+
+def test_pop_returns_none_when_the_worker_fails():
+    def create_trial(trial_index):
+        if trial_index == 3:
+            raise ValueError("broken trial")
+        return _create_trial(trial_index)
+
+    producer = StimulusProducer(create_trial, 1, 2)
+    producer.start()
+    try:
+        _wait_until(lambda: not producer.running)
+        assert producer.pop(1).trial_index == 1
+        assert producer.pop(2).trial_index == 2
+        # The failed trial is built by the caller, and is not counted as a miss
+        assert producer.pop(3) is None
+        assert isinstance(producer.error, ValueError)
+        assert producer.miss_count == 0
+    finally:
+        producer.stop()